@@ -6,18 +6,57 @@ from flask import Flask
 from flask_cors import CORS
 from app.config import Config
 from app.database.connection import MongoDB
+from app.database.cache import RedisCache
 
 
-def create_app(config_class=Config):
-    """Create and configure the Flask application."""
+def create_app(config_class=Config, minimal=False):
+    """Create and configure the Flask application.
+    
+    Args:
+        config_class: Configuration object to load
+        minimal: Only register /health, skipping the API blueprints
+                 (for health-check workers and admin scripts)
+    """
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Encode JSON responses with orjson when it is installed
+    from app.utils.json_provider import ORJSON_AVAILABLE, OrjsonProvider
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
+    
     # Enable CORS for frontend
     CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000"])
     
     # Initialize MongoDB connection
-    MongoDB.connect(app.config['MONGODB_URI'], app.config['MONGODB_DB'])
+    MongoDB.connect(
+        app.config['MONGODB_URI'],
+        app.config['MONGODB_DB'],
+        maxPoolSize=app.config['MONGODB_MAX_POOL_SIZE'],
+        minPoolSize=app.config['MONGODB_MIN_POOL_SIZE'],
+        maxIdleTimeMS=app.config['MONGODB_MAX_IDLE_TIME_MS'],
+        serverSelectionTimeoutMS=app.config['MONGODB_SERVER_SELECTION_TIMEOUT_MS'],
+        connectTimeoutMS=app.config['MONGODB_CONNECT_TIMEOUT_MS'],
+        socketTimeoutMS=app.config['MONGODB_SOCKET_TIMEOUT_MS'],
+        waitQueueTimeoutMS=app.config['MONGODB_WAIT_QUEUE_TIMEOUT_MS'],
+        compressors=app.config['MONGODB_COMPRESSORS'],
+        zlibCompressionLevel=app.config['MONGODB_ZLIB_COMPRESSION_LEVEL'],
+        readPreference=app.config['MONGODB_READ_PREFERENCE']
+    )
+    
+    # Optional Redis cache for user profile/history reads
+    RedisCache.connect(
+        app.config['REDIS_URL'],
+        socket_timeout=app.config['REDIS_SOCKET_TIMEOUT'],
+        socket_connect_timeout=app.config['REDIS_SOCKET_TIMEOUT']
+    )
+    
+    @app.route('/health')
+    def health_check():
+        return {'status': 'healthy', 'database': 'connected'}
+    
+    if minimal:
+        return app
     
     # Register blueprints
     from app.routes.movies import movies_bp
@@ -30,8 +69,16 @@ def create_app(config_class=Config):
     app.register_blueprint(recommendation_bp, url_prefix='/api')
     app.register_blueprint(analytics_bp, url_prefix='/api')
     
-    @app.route('/health')
-    def health_check():
-        return {'status': 'healthy', 'database': 'connected'}
+    # Opt-in: make sure the query indexes (incl. the weighted text index) exist
+    if app.config['CREATE_INDEXES'] and MongoDB.get_db() is not None:
+        from app.database.schemas import create_indices
+        try:
+            create_indices(MongoDB.get_db())
+        except Exception as e:
+            print(f"✗ Failed to create indices: {e}")
+    
+    if app.config['WARMUP_MODELS']:
+        from app.routes.recommendation import warmup_models
+        warmup_models()
     
     return app
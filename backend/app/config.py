@@ -24,10 +24,37 @@ class Config:
     else:
         MONGODB_URI = f"mongodb://{MONGODB_HOST}:{MONGODB_PORT}"
     
+    # MongoDB connection pool settings
+    MONGODB_MAX_POOL_SIZE = int(os.environ.get('MONGODB_MAX_POOL_SIZE', 100))
+    MONGODB_MIN_POOL_SIZE = int(os.environ.get('MONGODB_MIN_POOL_SIZE', 10))
+    MONGODB_MAX_IDLE_TIME_MS = int(os.environ.get('MONGODB_MAX_IDLE_TIME_MS', 300000))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 3000))
+    MONGODB_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGODB_CONNECT_TIMEOUT_MS', 5000))
+    MONGODB_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGODB_SOCKET_TIMEOUT_MS', 20000))
+    # Fail fast instead of queueing forever when the pool is exhausted
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 500))
+    
+    # Wire compression (unavailable compressors are skipped) and read routing
+    MONGODB_COMPRESSORS = os.environ.get('MONGODB_COMPRESSORS', 'zstd,zlib')
+    MONGODB_ZLIB_COMPRESSION_LEVEL = int(os.environ.get('MONGODB_ZLIB_COMPRESSION_LEVEL', 6))
+    # Catalog/analytics reads opt into secondaries per collection
+    MONGODB_READ_PREFERENCE = os.environ.get('MONGODB_READ_PREFERENCE', 'primary')
+    
+    # Redis cache for hot per-user reads (disabled when empty)
+    REDIS_URL = os.environ.get('REDIS_URL', '')
+    REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', 0.1))
+    
     # Model paths
     MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models_saved')
     DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
     
+    # Build missing indexes when the app starts (off by default: index
+    # builds belong to scripts/import_to_mongodb.py, not every worker)
+    CREATE_INDEXES = os.environ.get('CREATE_INDEXES', 'false').lower() == 'true'
+    
+    # Load saved models when the app starts instead of on the first request
+    WARMUP_MODELS = os.environ.get('WARMUP_MODELS', 'true').lower() == 'true'
+    
     # Recommendation settings
     DEFAULT_N_RECOMMENDATIONS = 10
     SIMILARITY_THRESHOLD = 0.1
@@ -0,0 +1,185 @@
+"""
+Redis cache for hot per-user reads.
+"""
+import json
+from typing import Any, Optional
+
+try:
+    import redis
+except ImportError:  # Redis is optional; reads then always go to MongoDB
+    redis = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class RedisCache:
+    """
+    Redis cache manager.
+    
+    Values are stored as JSON. The cache is best-effort: when Redis is not
+    configured, not installed or unreachable, gets miss and writes and
+    invalidations are dropped, so callers always fall back to MongoDB.
+    """
+    client = None
+    
+    @classmethod
+    def connect(cls, url: str, **client_options) -> None:
+        """
+        Connect to Redis.
+        
+        Args:
+            url: Redis URL (empty to disable the cache)
+            **client_options: Extra redis.Redis options (timeouts)
+        """
+        cls.client = None
+        if not url:
+            return
+        if redis is None:
+            print("✗ REDIS_URL is set but the redis package is not installed")
+            return
+        try:
+            client = redis.Redis.from_url(url, **client_options)
+            client.ping()
+            cls.client = client
+            print("✓ Connected to Redis")
+        except Exception as e:
+            print(f"✗ Failed to connect to Redis: {e}")
+    
+    @classmethod
+    def get_json(cls, key: str) -> Optional[Any]:
+        """
+        Get a cached value.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Decoded value, or None on a miss
+        """
+        if cls.client is None:
+            return None
+        try:
+            data = cls.client.get(key)
+        except Exception:
+            return None
+        if data is None:
+            return None
+        return orjson.loads(data) if orjson else json.loads(data)
+    
+    @classmethod
+    def set_json(cls, key: str, value: Any, ttl: int) -> None:
+        """
+        Cache a value.
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl: Seconds until the entry expires
+        """
+        if cls.client is None:
+            return
+        data = orjson.dumps(value) if orjson else json.dumps(value)
+        try:
+            cls.client.setex(key, ttl, data)
+        except Exception:
+            pass
+    
+    @classmethod
+    def hget_json(cls, key: str, field: str) -> Optional[Any]:
+        """
+        Get a cached value stored in a hash field.
+        
+        Args:
+            key: Hash key
+            field: Field within the hash
+            
+        Returns:
+            Decoded value, or None on a miss
+        """
+        if cls.client is None:
+            return None
+        try:
+            data = cls.client.hget(key, field)
+        except Exception:
+            return None
+        if data is None:
+            return None
+        return orjson.loads(data) if orjson else json.loads(data)
+    
+    @classmethod
+    def hset_json(cls, key: str, field: str, value: Any, ttl: int) -> None:
+        """
+        Cache a value in a hash field.
+        
+        The hash expires ttl seconds after its first field was written, so
+        related entries (e.g. one user's history pages) share one key that
+        a single DEL invalidates. If the TTL cannot be set the hash is
+        dropped rather than left to live without one.
+        
+        Args:
+            key: Hash key
+            field: Field within the hash
+            value: JSON-serializable value
+            ttl: Seconds until the hash expires
+        """
+        if cls.client is None:
+            return
+        data = orjson.dumps(value) if orjson else json.dumps(value)
+        try:
+            pipe = cls.client.pipeline(transaction=True)
+            pipe.hset(key, field, data)
+            pipe.ttl(key)
+            _, remaining = pipe.execute()
+            # Only a hash created by this write lacks a TTL (-1)
+            if remaining < 0:
+                cls.client.expire(key, ttl)
+        except Exception:
+            cls.delete(key)
+    
+    @classmethod
+    def delete(cls, *keys: str) -> None:
+        """
+        Invalidate cached values.
+        
+        Args:
+            *keys: Keys to delete
+        """
+        if cls.client is None or not keys:
+            return
+        try:
+            cls.client.delete(*keys)
+        except Exception:
+            pass
+
+
+# Key builders
+def user_profile_key(user_id: int) -> str:
+    """Key for a serialized user document."""
+    return f"user:{user_id}:profile"
+
+
+def user_history_key(user_id: int) -> str:
+    """Key for the hash of a user's rating history pages (field: limit)."""
+    return f"user:{user_id}:history"
+
+
+def user_rating_key(user_id: int, movie_id: int) -> str:
+    """Key for a single rating lookup."""
+    return f"user:{user_id}:rating:{movie_id}"
+
+
+def invalidate_user(user_id: int, movie_id: Optional[int] = None) -> None:
+    """
+    Drop a user's cached profile and rating history after a write.
+    
+    Args:
+        user_id: User whose data changed
+        movie_id: Movie whose rating changed, if any
+    """
+    keys = [user_profile_key(user_id), user_history_key(user_id)]
+    if movie_id is not None:
+        keys.append(user_rating_key(user_id, movie_id))
+    RedisCache.delete(*keys)
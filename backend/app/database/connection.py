@@ -1,29 +1,40 @@
 """
 MongoDB database connection module.
 """
-from pymongo import MongoClient
+from pymongo import MongoClient, ReadPreference
 from pymongo.database import Database
-from typing import Optional
+from pymongo.collection import Collection
+from typing import Dict, Optional
+
+# For read-mostly catalog and analytics data that tolerates replication
+# lag; everything else reads the primary so users see their own writes
+CATALOG_READ_PREFERENCE = ReadPreference.SECONDARY_PREFERRED
 
 
 class MongoDB:
     """MongoDB connection manager."""
     client: Optional[MongoClient] = None
     db: Optional[Database] = None
+    _connect_args: Optional[tuple] = None
+    _collections: Dict[str, Collection] = {}
     
     @classmethod
-    def connect(cls, uri: str, db_name: str) -> None:
+    def connect(cls, uri: str, db_name: str, **client_options) -> None:
         """
         Connect to MongoDB.
         
         Args:
             uri: MongoDB connection URI
             db_name: Database name
+            **client_options: Extra MongoClient options (pool sizes, timeouts,
+                              compressors, read preference)
         """
+        cls._connect_args = (uri, db_name, client_options)
+        cls._collections = {}
         try:
-            cls.client = MongoClient(uri)
+            cls.client = MongoClient(uri, **client_options)
             cls.db = cls.client[db_name]
-            # Test connection
+            # Test connection (also opens the first pooled connection)
             cls.client.admin.command('ping')
             print(f"✓ Connected to MongoDB database: {db_name}")
         except Exception as e:
@@ -32,25 +43,48 @@ class MongoDB:
             cls.client = None
             cls.db = None
     
+    @classmethod
+    def reconnect(cls) -> None:
+        """
+        Open a fresh client with the last connect() arguments.
+        
+        MongoClient is not fork-safe, so forked worker processes call this
+        instead of reusing the parent's sockets.
+        """
+        if cls._connect_args is None:
+            return
+        if cls.client:
+            cls.client.close()
+        uri, db_name, client_options = cls._connect_args
+        cls.connect(uri, db_name, **client_options)
+    
     @classmethod
     def get_db(cls) -> Optional[Database]:
         """Get the database instance."""
         return cls.db
     
     @classmethod
-    def get_collection(cls, name: str):
+    def get_collection(cls, name: str, read_preference=None):
         """
         Get a collection from the database.
         
         Args:
             name: Collection name
+            read_preference: Read preference overriding the client's
+                             (e.g. CATALOG_READ_PREFERENCE)
             
         Returns:
             Collection instance or None
         """
-        if cls.db is None:
-            return None
-        return cls.db[name]
+        key = name if read_preference is None else (name, repr(read_preference))
+        collection = cls._collections.get(key)
+        if collection is None and cls.db is not None:
+            if read_preference is None:
+                collection = cls.db[name]
+            else:
+                collection = cls.db.get_collection(name, read_preference=read_preference)
+            cls._collections[key] = collection
+        return collection
     
     @classmethod
     def close(cls) -> None:
@@ -79,3 +113,20 @@ class Collections:
     RATINGS = 'ratings'
     MODELS = 'models'
     WATCH_HISTORY = 'watch_history'
+    MOVIE_VECTORS = 'movie_vectors'
+    TOP_MOVIES = 'movies_top500'
+    META = 'meta'
+
+
+# Fields the API serializes, defaulted and type-coerced by the server so
+# documents come back ready to encode (_id stays in for keyset page cursors).
+# Expression projections in find() need MongoDB 4.4+.
+MOVIE_FIELDS = ('movieId', 'title', 'genres', 'year', 'avgRating', 'ratingCount')
+MOVIE_PROJECTION = {
+    'movieId': 1,
+    'title': {'$ifNull': ['$title', '']},
+    'genres': {'$ifNull': ['$genres', []]},
+    'year': {'$convert': {'input': '$year', 'to': 'int', 'onError': None, 'onNull': None}},
+    'avgRating': {'$convert': {'input': '$avgRating', 'to': 'double', 'onError': 0.0, 'onNull': 0.0}},
+    'ratingCount': {'$convert': {'input': '$ratingCount', 'to': 'int', 'onError': 0, 'onNull': 0}}
+}
@@ -3,6 +3,7 @@ MongoDB collection schemas and indices.
 """
 from datetime import datetime
 from typing import TypedDict, List, Optional
+from pymongo import IndexModel
 
 
 class MovieSchema(TypedDict):
@@ -13,9 +14,15 @@ class MovieSchema(TypedDict):
     year: Optional[int]
     avgRating: float
     ratingCount: int
+    createdAt: datetime
+    updatedAt: datetime
+
+
+class MovieVectorSchema(TypedDict):
+    """Movie feature vectors, kept apart so movie documents stay small."""
+    movieId: int
     tfidfVector: Optional[List[float]]
     embedding: Optional[List[float]]
-    createdAt: datetime
     updatedAt: datetime
 
 
@@ -57,33 +64,68 @@ class WatchHistorySchema(TypedDict):
     watchDuration: Optional[int]
 
 
+# Index definitions per collection
+INDEXES = {
+    'movies': [
+        IndexModel("movieId", unique=True),
+        IndexModel("genres"),
+        IndexModel([("avgRating", -1), ("_id", -1)]),
+        IndexModel([("ratingCount", -1), ("_id", -1)]),
+        IndexModel([("title", 1), ("_id", 1)]),
+        IndexModel([("genres", 1), ("avgRating", -1), ("_id", -1)]),
+        IndexModel([("genres", 1), ("ratingCount", -1), ("_id", -1)]),
+        IndexModel([("genres", 1), ("title", 1), ("_id", 1)]),
+        IndexModel([("avgRating", -1), ("ratingCount", -1)]),
+        IndexModel([("title", "text"), ("genres", "text")],
+                   weights={"title": 10, "genres": 5}, name="movies_text"),
+    ],
+    'movies_top500': [
+        IndexModel([("avgRating", -1)]),
+    ],
+    'movie_vectors': [
+        IndexModel("movieId", unique=True),
+    ],
+    'users': [
+        IndexModel("userId", unique=True),
+        IndexModel("username", unique=True),
+    ],
+    'ratings': [
+        IndexModel([("userId", 1), ("movieId", 1)], unique=True),
+        IndexModel([("movieId", 1), ("rating", 1)]),
+        IndexModel([("timestamp", -1)]),
+        IndexModel("rating"),
+    ],
+    'models': [
+        IndexModel([("modelName", 1), ("version", 1)], unique=True),
+    ],
+    'watch_history': [
+        IndexModel([("userId", 1), ("movieId", 1)]),
+        IndexModel([("watchedAt", -1)]),
+    ],
+}
+
+
 def create_indices(db):
     """
     Create database indices for optimal query performance.
     
+    Indices are sent in one createIndexes command per collection, and
+    ones that already exist are skipped so warm starts are cheap. A
+    collection holds at most one text index, so an older text index is
+    dropped when the definition changes.
+    
     Args:
         db: MongoDB database instance
     """
-    # Movies indices
-    db.movies.create_index("movieId", unique=True)
-    db.movies.create_index("genres")
-    db.movies.create_index([("avgRating", -1)])
-    db.movies.create_index([("title", "text")])
-    
-    # Users indices
-    db.users.create_index("userId", unique=True)
-    db.users.create_index("username", unique=True)
-    
-    # Ratings indices
-    db.ratings.create_index([("userId", 1), ("movieId", 1)], unique=True)
-    db.ratings.create_index("movieId")
-    db.ratings.create_index([("timestamp", -1)])
-    
-    # Models indices
-    db.models.create_index([("modelName", 1), ("version", 1)], unique=True)
-    
-    # Watch history indices
-    db.watch_history.create_index([("userId", 1), ("movieId", 1)])
-    db.watch_history.create_index([("watchedAt", -1)])
+    for collection_name, indexes in INDEXES.items():
+        collection = db[collection_name]
+        existing = set(collection.index_information())
+        missing = [idx for idx in indexes if idx.document['name'] not in existing]
+        if any('text' in idx.document['key'].values() for idx in missing):
+            for name, info in collection.index_information().items():
+                if ('_fts', 'text') in info['key']:
+                    collection.drop_index(name)
+        if missing:
+            collection.create_indexes(missing)
     
     print("✓ Database indices created successfully")
@@ -1,9 +1,30 @@
 """
 Models module exports.
+
+Model classes are imported lazily (PEP 562) so importing ``app.models``
+does not pull in numpy/scipy/scikit-learn until a model is actually used.
 """
-from app.models.content_based import ContentBasedModel
-from app.models.item_based import ItemBasedModel
-from app.models.user_based import UserBasedModel
-from app.models.hybrid import HybridModel
+import importlib
+
+_LAZY_MODELS = {
+    'ContentBasedModel': 'app.models.content_based',
+    'ItemBasedModel': 'app.models.item_based',
+    'UserBasedModel': 'app.models.user_based',
+    'HybridModel': 'app.models.hybrid',
+}
 
 __all__ = ['ContentBasedModel', 'ItemBasedModel', 'UserBasedModel', 'HybridModel']
+
+
+def __getattr__(name: str):
+    """Import model classes on first attribute access."""
+    if name in _LAZY_MODELS:
+        module = importlib.import_module(_LAZY_MODELS[name])
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,29 +3,90 @@ Content-Based Filtering recommendation model.
 Uses movie genres and TF-IDF vectors to find similar movies.
 """
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Optional, Set
-from sklearn.metrics.pairwise import cosine_similarity
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Dict, Optional, Set
 from scipy import sparse
 
+try:
+    import numba
+except ImportError:  # Numba is optional; NumPy/SciPy paths are used instead
+    numba = None
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _aggregate_columns(indptr, indices, data, weights, n_cols):
+    """
+    Fused per-movie aggregation over a CSC similarity block.
+    
+    For every column j computes sum_k S[k, j] * weights[k] and
+    sum_k |S[k, j]| in a single pass over the stored similarities.
+    """
+    scores = np.zeros(n_cols, dtype=np.float32)
+    abs_sums = np.zeros(n_cols, dtype=np.float32)
+    for j in numba.prange(n_cols):
+        score = np.float32(0.0)
+        abs_sum = np.float32(0.0)
+        for p in range(indptr[j], indptr[j + 1]):
+            value = data[p]
+            score += value * weights[indices[p]]
+            abs_sum += abs(value)
+        scores[j] = score
+        abs_sums[j] = abs_sum
+    return scores, abs_sums
+
+
+if numba is not None:
+    _aggregate_columns = numba.njit(parallel=True, fastmath=True, cache=True)(_aggregate_columns)
+else:
+    _aggregate_columns = None
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return indices of the k highest scores, sorted descending."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
 
 class ContentBasedModel:
     """Content-Based Filtering using TF-IDF on movie genres."""
     
+    # Rating histories whose recommendations are kept per model
+    _REC_CACHE_SIZE = 4096
+    
     def __init__(self):
         """Initialize the content-based model."""
-        self.movies_df: Optional[pd.DataFrame] = None
+        self.movies_df: Optional['pd.DataFrame'] = None
         self.tfidf_matrix: Optional[np.ndarray] = None
-        self.similarity_matrix: Optional[np.ndarray] = None
+        # Row-normalized feature matrix; cosine similarity is a dot product on it
+        self._X_norm: Optional[sparse.csr_matrix] = None
+        self._nonnegative: bool = False
         self.movie_id_to_idx: Dict[int, int] = {}
-        self.idx_to_movie_id: Dict[int, int] = {}
         self.embeddings: Optional[np.ndarray] = None
+        # Per-instance LRU of recommendations keyed on rating history
+        self._rec_cache: OrderedDict = OrderedDict()
+        self._rec_cache_lock = threading.Lock()
+        self._emb_norm: Optional[np.ndarray] = None
+        self._popular_order: Optional[np.ndarray] = None
+        # Fitted TF-IDF vectorizer and the genre vocabulary it was fitted on
+        self._vectorizer = None
+        self._genre_vocabulary: Optional[tuple] = None
+        # Column arrays for building results without pandas row access
+        self._movie_ids: Optional[np.ndarray] = None
+        self._titles: Optional[np.ndarray] = None
+        self._genres: List = []
+        self._avg_ratings: Optional[np.ndarray] = None
         self.is_fitted: bool = False
     
-    def fit(self, movies_df: pd.DataFrame, 
+    def fit(self, movies_df: 'pd.DataFrame', 
             tfidf_matrix: Optional[np.ndarray] = None,
             embeddings: Optional[np.ndarray] = None,
-            use_embeddings: bool = False) -> 'ContentBasedModel':
+            use_embeddings: bool = False,
+            vectorizer=None) -> 'ContentBasedModel':
         """
         Fit the model with movie data.
         
@@ -34,71 +95,153 @@ class ContentBasedModel:
             tfidf_matrix: Pre-computed TF-IDF matrix (optional)
             embeddings: Pre-computed embeddings (optional)
             use_embeddings: Whether to use embeddings for similarity
+            vectorizer: Pre-fitted Vectorizer to transform genres with (optional)
             
         Returns:
             Self for chaining
         """
+        from sklearn.preprocessing import normalize
+        
+        self._clear_rec_cache()
         self.movies_df = movies_df.reset_index(drop=True)
         
-        # Create index mappings
-        for idx, movie_id in enumerate(movies_df['movieId']):
-            self.movie_id_to_idx[movie_id] = idx
-            self.idx_to_movie_id[idx] = movie_id
+        # Cache result columns as arrays (SoA) for fast per-index lookups;
+        # self._movie_ids doubles as the index -> movieId mapping
+        self._movie_ids = self.movies_df['movieId'].to_numpy(dtype=np.int64)
+        self.movie_id_to_idx = dict(zip(self._movie_ids.tolist(), range(len(self._movie_ids))))
+        self._titles = self.movies_df['title'].to_numpy()
+        self._genres = self.movies_df['genres'].tolist()
+        if 'avgRating' in self.movies_df.columns:
+            self._avg_ratings = self.movies_df['avgRating'].fillna(0).to_numpy(dtype=np.float32)
+        else:
+            self._avg_ratings = np.zeros(len(self.movies_df), dtype=np.float32)
         
         # Compute TF-IDF if not provided
         if tfidf_matrix is None:
-            from app.services.vectorization import Vectorizer
-            vectorizer = Vectorizer()
-            genres_list = movies_df['genres'].tolist()
-            tfidf_matrix, _ = vectorizer.tfidf_vectorize(genres_list)
+            genres_list = self.movies_df['genres'].tolist()
+            tfidf_matrix = self._vectorize_genres(genres_list, vectorizer)
         
-        self.tfidf_matrix = tfidf_matrix
+        # Similarities only rank movies, so float32 is plenty and halves memory
+        self.tfidf_matrix = tfidf_matrix.astype(np.float32, copy=False)
         
         # Handle embeddings
         if embeddings is not None:
-            self.embeddings = embeddings
-        
-        # Compute similarity matrix
-        if use_embeddings and self.embeddings is not None:
-            # Combine TF-IDF and embeddings
-            feature_matrix = self._combine_features()
-            self.similarity_matrix = cosine_similarity(feature_matrix)
+            self.embeddings = np.asarray(embeddings, dtype=np.float32)
+        
+        # L2-normalize each feature block once so cosine similarity is a
+        # plain dot product; rows are compared on demand instead of
+        # materializing a dense N x N matrix
+        tfidf_norm = normalize(sparse.csr_matrix(self.tfidf_matrix), norm='l2')
+        if self.embeddings is not None:
+            self._emb_norm = normalize(self.embeddings, norm='l2')
+        
+        if use_embeddings and self._emb_norm is not None:
+            # Weighted concatenation of unit-norm blocks needs one rescale
+            X_norm = normalize(self._combine_features(tfidf_norm), norm='l2', copy=False)
         else:
             # Use only TF-IDF
-            if sparse.issparse(self.tfidf_matrix):
-                self.similarity_matrix = cosine_similarity(self.tfidf_matrix)
-            else:
-                self.similarity_matrix = cosine_similarity(self.tfidf_matrix)
+            X_norm = tfidf_norm
+        self._X_norm = X_norm.tocsr()
+        # With non-negative features (TF-IDF) all similarities are >= 0,
+        # which lets recommend_for_user fold its normalizer into one query
+        self._nonnegative = self._X_norm.nnz == 0 or bool(self._X_norm.data.min() >= 0)
+        
+        # Popularity ranking is static until the next fit, so sort once here
+        if 'ratingCount' in self.movies_df.columns:
+            sorted_df = self.movies_df.sort_values(
+                by=['ratingCount', 'avgRating'], 
+                ascending=[False, False]
+            )
+        else:
+            sorted_df = self.movies_df.sort_values(
+                by='avgRating', ascending=False
+            )
+        self._popular_order = sorted_df.index.to_numpy()
         
         self.is_fitted = True
         return self
     
-    def _combine_features(self, tfidf_weight: float = 0.5) -> np.ndarray:
+    def _vectorize_genres(self, genres_list: List[List[str]], vectorizer=None):
+        """
+        TF-IDF vectorize genres, reusing a fitted vectorizer when possible.
+        
+        A pre-fitted vectorizer passed by the caller is used as-is. On refit,
+        the vectorizer from the previous fit is reused if the genre
+        vocabulary has not changed.
+        """
+        from app.services.vectorization import Vectorizer
+        
+        if vectorizer is not None and vectorizer.tfidf_vectorizer is not None:
+            self._vectorizer = vectorizer
+            self._genre_vocabulary = None
+            return vectorizer.tfidf_transform(genres_list)
+        
+        vocabulary = tuple(sorted({genre for genres in genres_list for genre in genres}))
+        if self._vectorizer is not None and vocabulary == self._genre_vocabulary:
+            return self._vectorizer.tfidf_transform(genres_list)
+        
+        if vectorizer is None:
+            vectorizer = Vectorizer(load_sentence_model=False)
+        tfidf_matrix, _ = vectorizer.tfidf_vectorize(genres_list)
+        self._vectorizer = vectorizer
+        self._genre_vocabulary = vocabulary
+        return tfidf_matrix
+    
+    def _combine_features(self, tfidf_norm: sparse.csr_matrix,
+                          tfidf_weight: float = 0.5) -> sparse.csr_matrix:
         """
         Combine TF-IDF and embedding features.
         
+        Both inputs are already row-normalized. The TF-IDF block stays
+        sparse; only the (already dense) embeddings are added as a dense
+        block of the combined CSR matrix.
+        
         Args:
+            tfidf_norm: Row-normalized TF-IDF matrix
             tfidf_weight: Weight for TF-IDF features (1 - weight for embeddings)
             
         Returns:
             Combined feature matrix
         """
-        # Normalize TF-IDF
-        tfidf = self.tfidf_matrix
-        if sparse.issparse(tfidf):
-            tfidf = tfidf.toarray()
-        tfidf_norm = tfidf / (np.linalg.norm(tfidf, axis=1, keepdims=True) + 1e-8)
-        
-        # Normalize embeddings
-        emb_norm = self.embeddings / (np.linalg.norm(self.embeddings, axis=1, keepdims=True) + 1e-8)
-        
-        # Weighted combination
-        combined = np.hstack([
-            tfidf_norm * tfidf_weight,
-            emb_norm * (1 - tfidf_weight)
-        ])
-        
-        return combined
+        return sparse.hstack([
+            tfidf_norm * np.float32(tfidf_weight),
+            sparse.csr_matrix(self._emb_norm * np.float32(1 - tfidf_weight))
+        ], format='csr')
+    
+    def _exclude_mask(self, exclude: Optional[Set[int]]) -> np.ndarray:
+        """Boolean mask over matrix indices marking excluded movie IDs."""
+        mask = np.zeros(len(self._movie_ids), dtype=bool)
+        if exclude:
+            exclude_idxs = [self.movie_id_to_idx[m] for m in exclude if m in self.movie_id_to_idx]
+            mask[exclude_idxs] = True
+        return mask
+    
+    def _movie_record(self, idx: int) -> Dict:
+        """Build the base result dict for the movie at a matrix index."""
+        return {
+            'movieId': int(self._movie_ids[idx]),
+            'title': self._titles[idx],
+            'genres': self._genres[idx],
+            'avgRating': float(self._avg_ratings[idx])
+        }
+    
+    def _similarity_row(self, idx: int) -> np.ndarray:
+        """Compute cosine similarities between one movie and all movies."""
+        sims = self._X_norm @ self._X_norm[idx:idx + 1].T
+        if sparse.issparse(sims):
+            sims = sims.toarray()
+        return np.asarray(sims).ravel()
+    
+    def _similarity_entries(self, idx: int, idxs: np.ndarray) -> np.ndarray:
+        """Compute cosine similarities between one movie and the movies at idxs."""
+        sims = self._X_norm[idxs] @ self._X_norm[idx:idx + 1].T
+        if sparse.issparse(sims):
+            sims = sims.toarray()
+        return np.asarray(sims).ravel()
+    
+    def _similarity_rows(self, idxs: np.ndarray):
+        """Compute a (len(idxs), N) block of similarities in one matmul (sparse for TF-IDF)."""
+        return self._X_norm[idxs] @ self._X_norm.T
     
     def get_similar_movies(self, movie_id: int, 
                            n: int = 10,
@@ -121,31 +264,20 @@ class ContentBasedModel:
             return []
         
         idx = self.movie_id_to_idx[movie_id]
-        similarities = self.similarity_matrix[idx]
+        similarities = self._similarity_row(idx)
         
-        # Get sorted indices (excluding self)
-        similar_indices = np.argsort(similarities)[::-1]
+        # Mask out the movie itself and exclusions, then partial sort
+        excluded = self._exclude_mask(exclude)
+        excluded[idx] = True
+        ranked = np.where(excluded, -np.inf, similarities)
+        similar_indices = _top_k_indices(ranked, n)
+        similar_indices = similar_indices[~excluded[similar_indices]]
         
         results = []
-        exclude = exclude or set()
-        
         for sim_idx in similar_indices:
-            if len(results) >= n:
-                break
-            
-            sim_movie_id = self.idx_to_movie_id[sim_idx]
-            
-            if sim_movie_id == movie_id or sim_movie_id in exclude:
-                continue
-            
-            movie_data = self.movies_df.iloc[sim_idx]
-            results.append({
-                'movieId': int(sim_movie_id),
-                'title': movie_data['title'],
-                'genres': movie_data['genres'],
-                'avgRating': float(movie_data.get('avgRating', 0)),
-                'similarity': float(similarities[sim_idx])
-            })
+            movie_info = self._movie_record(sim_idx)
+            movie_info['similarity'] = float(similarities[sim_idx])
+            results.append(movie_info)
         
         return results
     
@@ -176,50 +308,108 @@ class ContentBasedModel:
         exclude = exclude or set()
         exclude.update([m['movieId'] for m in user_rated_movies])
         
-        # Aggregate similarity scores
-        n_movies = len(self.movies_df)
-        scores = np.zeros(n_movies)
-        weights = np.zeros(n_movies)
+        # Results only depend on the rating history, so repeat requests
+        # between rating events (from any user with the same history) are
+        # served from the LRU cache
+        ratings_key = tuple(sorted(
+            (m['movieId'], round(m.get('rating', 3.0), 1)) for m in user_rated_movies
+        ))
+        cache_key = (ratings_key, n, frozenset(exclude))
+        with self._rec_cache_lock:
+            cached = self._rec_cache.get(cache_key)
+            if cached is not None:
+                self._rec_cache.move_to_end(cache_key)
+        if cached is None:
+            cached = self._recommend_uncached(*cache_key)
+            with self._rec_cache_lock:
+                self._rec_cache[cache_key] = cached
+                while len(self._rec_cache) > self._REC_CACHE_SIZE:
+                    self._rec_cache.popitem(last=False)
+        return [dict(rec) for rec in cached]
+    
+    def _clear_rec_cache(self) -> None:
+        """Drop cached recommendations (their scores depend on the fit)."""
+        with self._rec_cache_lock:
+            self._rec_cache.clear()
+    
+    def __getstate__(self) -> Dict:
+        # The cache and its lock are per process and not picklable
+        state = self.__dict__.copy()
+        state.pop('_rec_cache', None)
+        state.pop('_rec_cache_lock', None)
+        return state
+    
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._rec_cache = OrderedDict()
+        self._rec_cache_lock = threading.Lock()
+    
+    def _recommend_uncached(self, ratings_key: tuple, n: int,
+                            exclude: frozenset) -> tuple:
+        """Compute recommendations for a rating fingerprint."""
+        # Gather rated movie indices and ratings in one pass
+        known = [(m, r) for m, r in ratings_key if m in self.movie_id_to_idx]
+        rated_idxs = np.fromiter(
+            (self.movie_id_to_idx[m] for m, _ in known),
+            dtype=np.int64, count=len(known)
+        )
+        ratings = np.fromiter(
+            (r for _, r in known),
+            dtype=np.float32, count=len(known)
+        )
+        # Weight positive ratings more
+        rating_weights = (ratings - 2.5) / 2.5  # Normalize to [-1, 1]
         
-        for rated in user_rated_movies:
-            movie_id = rated['movieId']
-            rating = rated.get('rating', 3.0)
-            
-            if movie_id in self.movie_id_to_idx:
-                idx = self.movie_id_to_idx[movie_id]
-                # Weight positive ratings more
-                weight = (rating - 2.5) / 2.5  # Normalize to [-1, 1]
-                scores += self.similarity_matrix[idx] * weight
-                weights += np.abs(self.similarity_matrix[idx])
+        # Aggregate similarity scores
+        n_movies = len(self._movie_ids)
+        if len(rated_idxs) > 0 and self._nonnegative:
+            # Collapse the rated rows into two query vectors (rating-weighted
+            # and plain sum) and score every movie with one sparse matmul;
+            # cost scales with nnz of the queries instead of K x N
+            query_weights = np.vstack([rating_weights, np.ones_like(rating_weights)])
+            queries = sparse.csr_matrix(query_weights) @ self._X_norm[rated_idxs]
+            result = self._X_norm @ queries.T
+            if sparse.issparse(result):
+                result = result.toarray()
+            scores = np.ascontiguousarray(result[:, 0])
+            weights = np.ascontiguousarray(result[:, 1])
+        elif len(rated_idxs) > 0:
+            # Similarities may be negative, so |S| needs the explicit block
+            sim_rows = self._similarity_rows(rated_idxs)
+            if _aggregate_columns is not None:
+                # One fused parallel pass instead of a matvec plus |S| sum
+                sim_cols = sparse.csc_matrix(sim_rows, dtype=np.float32)
+                scores, weights = _aggregate_columns(
+                    sim_cols.indptr, sim_cols.indices, sim_cols.data,
+                    rating_weights, n_movies
+                )
+            else:
+                scores = np.asarray(sim_rows.T @ rating_weights).ravel()
+                weights = np.asarray(abs(sim_rows).sum(axis=0)).ravel()
+        else:
+            scores = np.zeros(n_movies, dtype=np.float32)
+            weights = np.zeros(n_movies, dtype=np.float32)
         
         # Normalize scores
         with np.errstate(divide='ignore', invalid='ignore'):
-            scores = np.divide(scores, weights, where=weights > 0)
+            scores = np.divide(scores, weights, out=np.zeros_like(scores),
+                               where=weights > 0)
             scores = np.nan_to_num(scores)
         
-        # Get top recommendations
-        top_indices = np.argsort(scores)[::-1]
+        # Mask out exclusions, then partial sort for the top n
+        excluded = self._exclude_mask(exclude)
+        scores[excluded] = -np.inf
+        top_indices = _top_k_indices(scores, n)
+        top_indices = top_indices[~excluded[top_indices]]
         
         results = []
         for idx in top_indices:
-            if len(results) >= n:
-                break
-            
-            movie_id = self.idx_to_movie_id[idx]
-            if movie_id in exclude:
-                continue
-            
-            movie_data = self.movies_df.iloc[idx]
-            results.append({
-                'movieId': int(movie_id),
-                'title': movie_data['title'],
-                'genres': movie_data['genres'],
-                'avgRating': float(movie_data.get('avgRating', 0)),
-                'score': float(scores[idx]),
-                'method': 'content_based'
-            })
+            movie_info = self._movie_record(idx)
+            movie_info['score'] = float(scores[idx])
+            movie_info['method'] = 'content_based'
+            results.append(movie_info)
         
-        return results
+        return tuple(results)
     
     def predict_rating(self, user_id: int, movie_id: int,
                        user_rated_movies: Optional[List[Dict]] = None) -> Optional[float]:
@@ -242,21 +432,24 @@ class ContentBasedModel:
         
         movie_idx = self.movie_id_to_idx[movie_id]
         
-        weighted_sum = 0.0
-        similarity_sum = 0.0
-        
-        for rated in user_rated_movies:
-            rated_id = rated['movieId']
-            if rated_id in self.movie_id_to_idx:
-                rated_idx = self.movie_id_to_idx[rated_id]
-                similarity = self.similarity_matrix[movie_idx, rated_idx]
-                
-                if similarity > 0:
-                    weighted_sum += similarity * rated['rating']
-                    similarity_sum += similarity
+        # Gather rated movies and their similarity to the target in one matvec
+        known = [r for r in user_rated_movies if r['movieId'] in self.movie_id_to_idx]
+        if not known:
+            return None
         
+        rated_idxs = np.fromiter(
+            (self.movie_id_to_idx[r['movieId']] for r in known),
+            dtype=np.int64, count=len(known)
+        )
+        ratings = np.fromiter(
+            (r['rating'] for r in known), dtype=np.float32, count=len(known)
+        )
+        sims = (self._X_norm[rated_idxs] @ self._X_norm[movie_idx].T).toarray().ravel()
+        
+        mask = sims > 0
+        similarity_sum = sims[mask].sum()
         if similarity_sum > 0:
-            return weighted_sum / similarity_sum
+            return float(np.dot(sims[mask], ratings[mask]) / similarity_sum)
         
         return None
     
@@ -264,31 +457,104 @@ class ContentBasedModel:
         """Get popular movies as fallback."""
         exclude = exclude or set()
         
-        if 'ratingCount' in self.movies_df.columns:
-            sorted_df = self.movies_df.sort_values(
-                by=['ratingCount', 'avgRating'], 
-                ascending=[False, False]
-            )
-        else:
-            sorted_df = self.movies_df.sort_values(
-                by='avgRating', ascending=False
-            )
+        # Only the head of the precomputed order can make it into the result
+        candidates = self._popular_order[:n + len(exclude)]
         
         results = []
-        for _, row in sorted_df.iterrows():
-            if row['movieId'] in exclude:
+        for idx in candidates:
+            if self._movie_ids[idx] in exclude:
                 continue
             
-            results.append({
-                'movieId': int(row['movieId']),
-                'title': row['title'],
-                'genres': row['genres'],
-                'avgRating': float(row.get('avgRating', 0)),
-                'score': float(row.get('avgRating', 0)),
-                'method': 'popular'
-            })
+            movie_info = self._movie_record(idx)
+            movie_info['score'] = movie_info['avgRating']
+            movie_info['method'] = 'popular'
+            results.append(movie_info)
             
             if len(results) >= n:
                 break
         
         return results
+    
+    # Large arrays are written as .npy files so load() can memory-map them
+    _ARRAY_FILES = ('X_data', 'X_indices', 'X_indptr', 'movie_ids', 'avg_ratings', 'popular_order')
+    
+    def save(self, path: str) -> None:
+        """
+        Persist the fitted model to a directory.
+        
+        Feature and lookup arrays go to .npy files; the remaining small
+        state (titles, genres, fitted vectorizer) is pickled.
+        
+        Args:
+            path: Directory to write the model files to
+        """
+        import os
+        import pickle
+        
+        if not self.is_fitted:
+            raise RuntimeError("Model not fitted. Call fit() first.")
+        
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            'X_data': self._X_norm.data,
+            'X_indices': self._X_norm.indices,
+            'X_indptr': self._X_norm.indptr,
+            'movie_ids': self._movie_ids,
+            'avg_ratings': self._avg_ratings,
+            'popular_order': self._popular_order,
+        }
+        for name in self._ARRAY_FILES:
+            np.save(os.path.join(path, f'{name}.npy'), arrays[name])
+        
+        meta = {
+            'shape': self._X_norm.shape,
+            'nonnegative': self._nonnegative,
+            'titles': self._titles,
+            'genres': self._genres,
+            'vectorizer': self._vectorizer,
+            'genre_vocabulary': self._genre_vocabulary,
+        }
+        with open(os.path.join(path, 'meta.pkl'), 'wb') as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> 'ContentBasedModel':
+        """
+        Load a model written by save().
+        
+        Arrays are memory-mapped read-only by default, so worker processes
+        serving the same model share its pages through the OS page cache.
+        
+        Args:
+            path: Directory the model was saved to
+            mmap_mode: numpy mmap mode for the arrays (None reads them into memory)
+            
+        Returns:
+            Fitted ContentBasedModel
+        """
+        import os
+        import pickle
+        
+        arrays = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+            for name in cls._ARRAY_FILES
+        }
+        with open(os.path.join(path, 'meta.pkl'), 'rb') as f:
+            meta = pickle.load(f)
+        
+        model = cls()
+        model._X_norm = sparse.csr_matrix(
+            (arrays['X_data'], arrays['X_indices'], arrays['X_indptr']),
+            shape=meta['shape'], copy=False
+        )
+        model._nonnegative = meta['nonnegative']
+        model._movie_ids = arrays['movie_ids']
+        model.movie_id_to_idx = dict(zip(model._movie_ids.tolist(), range(len(model._movie_ids))))
+        model._avg_ratings = arrays['avg_ratings']
+        model._popular_order = arrays['popular_order']
+        model._titles = meta['titles']
+        model._genres = meta['genres']
+        model._vectorizer = meta['vectorizer']
+        model._genre_vocabulary = meta['genre_vocabulary']
+        model.is_fitted = True
+        return model
@@ -2,9 +2,29 @@
 Hybrid recommendation model.
 Combines Content-Based and Collaborative Filtering approaches.
 """
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from typing import List, Dict, Optional, Set, Tuple
-import pandas as pd
+from typing import TYPE_CHECKING, List, Dict, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Shared pool for running the component models of one request concurrently;
+# kept at module level so HybridModel instances stay picklable
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _component_executor() -> ThreadPoolExecutor:
+    """Return the shared component thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='hybrid')
+    return _executor
 
 
 class HybridModel:
@@ -21,23 +41,30 @@ class HybridModel:
             content_weight: Weight for content-based recommendations
             item_weight: Weight for item-based collaborative filtering
             user_weight: Weight for user-based collaborative filtering
+            
+        A weight of exactly 0 skips that component when predicting and
+        recommending.
         """
         # Normalize weights
         total = content_weight + item_weight + user_weight
         self.content_weight = content_weight / total
         self.item_weight = item_weight / total
         self.user_weight = user_weight / total
+        # Same weights as a (content, item, user) vector for the merge steps
+        self._weights = np.array([self.content_weight, self.item_weight, self.user_weight])
         
         self.content_model = None
         self.item_model = None
         self.user_model = None
         
-        self.movies_df: Optional[pd.DataFrame] = None
-        self.ratings_df: Optional[pd.DataFrame] = None
+        self.movies_df: Optional['pd.DataFrame'] = None
+        self.ratings_df: Optional['pd.DataFrame'] = None
+        # userId -> (movie IDs, ratings) arrays, grouped once in fit
+        self._ratings_by_user: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
         self.is_fitted: bool = False
     
-    def fit(self, movies_df: pd.DataFrame, 
-            ratings_df: pd.DataFrame,
+    def fit(self, movies_df: 'pd.DataFrame', 
+            ratings_df: 'pd.DataFrame',
             content_model=None,
             item_model=None,
             user_model=None) -> 'HybridModel':
@@ -56,6 +83,7 @@ class HybridModel:
         """
         self.movies_df = movies_df
         self.ratings_df = ratings_df
+        self._ratings_by_user = self._group_ratings_by_user(ratings_df)
         
         # Fit or use provided models
         if content_model is not None:
@@ -102,7 +130,7 @@ class HybridModel:
         weights = []
         
         # Content-based prediction
-        if self.content_model is not None and user_rated_movies:
+        if self.content_weight > 0 and self.content_model is not None and user_rated_movies:
             cb_pred = self.content_model.predict_rating(
                 user_id, movie_id, user_rated_movies
             )
@@ -111,14 +139,14 @@ class HybridModel:
                 weights.append(self.content_weight)
         
         # Item-based prediction
-        if self.item_model is not None:
+        if self.item_weight > 0 and self.item_model is not None:
             ib_pred = self.item_model.predict_rating(user_id, movie_id)
             if ib_pred is not None:
                 predictions.append(ib_pred)
                 weights.append(self.item_weight)
         
         # User-based prediction
-        if self.user_model is not None:
+        if self.user_weight > 0 and self.user_model is not None:
             ub_pred = self.user_model.predict_rating(user_id, movie_id)
             if ub_pred is not None:
                 predictions.append(ub_pred)
@@ -127,12 +155,11 @@ class HybridModel:
         if not predictions:
             return None
         
-        # Weighted average
-        weights = np.array(weights)
-        weights = weights / weights.sum()
-        predicted = np.average(predictions, weights=weights)
+        # Weighted average (plain Python is cheaper than NumPy for <= 3 terms)
+        total_weight = sum(weights)
+        predicted = sum(p * w for p, w in zip(predictions, weights)) / total_weight
         
-        return float(np.clip(predicted, 0.5, 5.0))
+        return float(min(5.0, max(0.5, predicted)))
     
     def recommend(self, user_id: int, n: int = 10,
                   exclude: Optional[Set[int]] = None,
@@ -154,104 +181,160 @@ class HybridModel:
         
         exclude = exclude or set()
         
-        # Get recommendations from each model
-        all_scores: Dict[int, Dict] = {}
-        
-        # Content-based recommendations
         if self.content_model is not None:
             if user_rated_movies is None:
                 user_rated_movies = self._get_user_ratings(user_id)
+            # Content-based scoring drops rated movies; apply that up front
+            # so every component sees the same exclusions
+            exclude.update(rated['movieId'] for rated in user_rated_movies)
+        
+        # Get recommendations from each model concurrently
+        pool = _component_executor()
+        cb_future = ib_future = ub_future = None
+        if self.content_weight > 0 and self.content_model is not None:
+            cb_future = pool.submit(self.content_model.recommend_for_user,
+                                    user_id, user_rated_movies, n=n*2, exclude=set(exclude))
+        if self.item_weight > 0 and self.item_model is not None:
+            ib_future = pool.submit(self.item_model.recommend, user_id, n=n*2, exclude=exclude)
+        if self.user_weight > 0 and self.user_model is not None:
+            ub_future = pool.submit(self.user_model.recommend, user_id, n=n*2, exclude=exclude)
+        
+        cb_recs = cb_future.result() if cb_future is not None else []
+        ib_recs = ib_future.result() if ib_future is not None else []
+        ub_recs = ub_future.result() if ub_future is not None else []
+        
+        return self._combine_recommendations(cb_recs, ib_recs, ub_recs, exclude, n)
+    
+    def recommend_batch(self, user_ids: List[int], n: int = 10,
+                        exclude_per_user: Optional[Dict[int, Set[int]]] = None,
+                        user_rated_movies_per_user: Optional[Dict[int, List[Dict]]] = None
+                        ) -> List[List[Dict]]:
+        """
+        Get hybrid recommendations for several users.
+        
+        Item-based candidates for the whole batch come from one batched
+        call; content- and user-based candidates are gathered per user.
+        
+        Args:
+            user_ids: User IDs
+            n: Number of recommendations per user
+            exclude_per_user: Movie IDs to exclude, keyed by user ID
+            user_rated_movies_per_user: Rated movies keyed by user ID
             
-            cb_recs = self.content_model.recommend_for_user(
-                user_id, user_rated_movies, n=n*2, exclude=exclude
-            )
-            for rec in cb_recs:
-                movie_id = rec['movieId']
-                if movie_id not in all_scores:
-                    all_scores[movie_id] = {
-                        'movieId': movie_id,
-                        'title': rec['title'],
-                        'genres': rec['genres'],
-                        'avgRating': rec.get('avgRating', 0),
-                        'scores': {},
-                        'total_weight': 0
-                    }
-                all_scores[movie_id]['scores']['content'] = rec.get('score', 0)
-                all_scores[movie_id]['total_weight'] += self.content_weight
-        
-        # Item-based recommendations
-        if self.item_model is not None:
-            ib_recs = self.item_model.recommend(user_id, n=n*2, exclude=exclude)
-            for rec in ib_recs:
-                movie_id = rec['movieId']
-                if movie_id not in all_scores:
-                    all_scores[movie_id] = {
-                        'movieId': movie_id,
-                        'title': rec['title'],
-                        'genres': rec['genres'],
-                        'avgRating': rec.get('avgRating', 0),
-                        'scores': {},
-                        'total_weight': 0
-                    }
-                all_scores[movie_id]['scores']['item'] = rec.get('score', 0)
-                all_scores[movie_id]['total_weight'] += self.item_weight
-        
-        # User-based recommendations
-        if self.user_model is not None:
-            ub_recs = self.user_model.recommend(user_id, n=n*2, exclude=exclude)
-            for rec in ub_recs:
-                movie_id = rec['movieId']
-                if movie_id not in all_scores:
-                    all_scores[movie_id] = {
-                        'movieId': movie_id,
-                        'title': rec['title'],
-                        'genres': rec['genres'],
-                        'avgRating': rec.get('avgRating', 0),
-                        'scores': {},
-                        'total_weight': 0
-                    }
-                all_scores[movie_id]['scores']['user'] = rec.get('score', 0)
-                all_scores[movie_id]['total_weight'] += self.user_weight
+        Returns:
+            Recommendation lists in the same order as user_ids
+        """
+        if not self.is_fitted:
+            return [[] for _ in user_ids]
+        
+        exclude_per_user = exclude_per_user or {}
+        user_rated_movies_per_user = user_rated_movies_per_user or {}
+        excludes = {uid: set(exclude_per_user.get(uid) or ()) for uid in user_ids}
+        
+        # Rated movies are excluded for every component, as in recommend
+        rated_per_user: Dict[int, List[Dict]] = {}
+        if self.content_model is not None:
+            for user_id in user_ids:
+                user_rated_movies = user_rated_movies_per_user.get(user_id)
+                if user_rated_movies is None:
+                    user_rated_movies = self._get_user_ratings(user_id)
+                rated_per_user[user_id] = user_rated_movies
+                excludes[user_id].update(rated['movieId'] for rated in user_rated_movies)
+        
+        cb_batch = [[] for _ in user_ids]
+        if self.content_weight > 0 and self.content_model is not None:
+            for i, user_id in enumerate(user_ids):
+                cb_batch[i] = self.content_model.recommend_for_user(
+                    user_id, rated_per_user[user_id], n=n*2, exclude=set(excludes[user_id])
+                )
+        
+        ib_batch = [[] for _ in user_ids]
+        if self.item_weight > 0 and self.item_model is not None:
+            ib_batch = self.item_model.recommend_batch(user_ids, n=n*2,
+                                                       exclude_per_user=excludes)
         
-        # Compute final scores
         results = []
-        for movie_id, data in all_scores.items():
-            if movie_id in exclude:
-                continue
-            
-            scores = data['scores']
+        for user_id, cb_recs, ib_recs in zip(user_ids, cb_batch, ib_batch):
+            exclude = excludes[user_id]
             
-            # Weighted sum of available scores
-            final_score = 0
-            weight_sum = 0
-            
-            if 'content' in scores:
-                final_score += scores['content'] * self.content_weight
-                weight_sum += self.content_weight
-            if 'item' in scores:
-                final_score += scores['item'] * self.item_weight
-                weight_sum += self.item_weight
-            if 'user' in scores:
-                final_score += scores['user'] * self.user_weight
-                weight_sum += self.user_weight
-            
-            if weight_sum > 0:
-                final_score /= weight_sum
+            ub_recs = []
+            if self.user_weight > 0 and self.user_model is not None:
+                ub_recs = self.user_model.recommend(user_id, n=n*2, exclude=exclude)
             
+            results.append(self._combine_recommendations(cb_recs, ib_recs, ub_recs, exclude, n))
+        
+        return results
+    
+    def _combine_recommendations(self, cb_recs: List[Dict], ib_recs: List[Dict],
+                                 ub_recs: List[Dict], exclude: Set[int],
+                                 n: int) -> List[Dict]:
+        """
+        Merge per-model recommendation lists into weighted hybrid scores.
+        
+        All candidates are concatenated into flat arrays and grouped by
+        movie ID, so the weighted means come from two bincounts. Result
+        dicts are only built for the final top-n.
+        """
+        components = (('content', cb_recs), ('item', ib_recs), ('user', ub_recs))
+        recs = [rec for _, model_recs in components for rec in model_recs]
+        if not recs:
+            return []
+        keys = [key for key, model_recs in components for _ in model_recs]
+        
+        movie_ids = np.fromiter((rec['movieId'] for rec in recs), dtype=np.int64, count=len(recs))
+        scores = np.fromiter((rec.get('score', 0) for rec in recs), dtype=np.float64, count=len(recs))
+        component_idx = np.repeat(np.arange(3), [len(model_recs) for _, model_recs in components])
+        
+        unique_ids, first_seen, group, final_scores = self._weighted_merge(
+            movie_ids, scores, self._weights[component_idx]
+        )
+        
+        if exclude:
+            keep = ~np.isin(unique_ids, np.fromiter(exclude, dtype=np.int64, count=len(exclude)))
+        else:
+            keep = np.ones(len(unique_ids), dtype=bool)
+        candidates = np.flatnonzero(keep)
+        
+        # Sort by final score, then by first appearance
+        order = np.lexsort((first_seen[candidates], -final_scores[candidates]))
+        top_groups = candidates[order[:n]].tolist()
+        
+        component_scores: Dict[int, Dict] = {g: {} for g in top_groups}
+        for pos in np.flatnonzero(np.isin(group, top_groups)).tolist():
+            component_scores[group[pos]][keys[pos]] = recs[pos].get('score', 0)
+        
+        results = []
+        for g in top_groups:
+            first = recs[first_seen[g]]
             results.append({
-                'movieId': movie_id,
-                'title': data['title'],
-                'genres': data['genres'],
-                'avgRating': data['avgRating'],
-                'score': float(final_score),
+                'movieId': first['movieId'],
+                'title': first['title'],
+                'genres': first['genres'],
+                'avgRating': first.get('avgRating', 0),
+                'score': float(final_scores[g]),
                 'method': 'hybrid',
-                'component_scores': scores
+                'component_scores': component_scores[g]
             })
         
-        # Sort by final score
-        results.sort(key=lambda x: x['score'], reverse=True)
+        return results
+    
+    @staticmethod
+    def _weighted_merge(movie_ids: np.ndarray, scores: np.ndarray,
+                        weights: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Group candidate scores by movie and take their weighted mean.
         
-        return results[:n]
+        Returns:
+            (unique movie IDs, first position of each, group of each candidate,
+            weighted mean score per unique movie)
+        """
+        # first_seen keeps the original merge order for ties
+        unique_ids, first_seen, group = np.unique(movie_ids, return_index=True, return_inverse=True)
+        weighted_sum = np.bincount(group, weights=scores * weights)
+        weight_sum = np.bincount(group, weights=weights)
+        final_scores = np.divide(weighted_sum, weight_sum,
+                                 out=weighted_sum.copy(), where=weight_sum > 0)
+        return unique_ids, first_seen, group, final_scores
     
     def get_similar_movies(self, movie_id: int, n: int = 10) -> List[Dict]:
         """
@@ -267,67 +350,42 @@ class HybridModel:
         if not self.is_fitted:
             return []
         
-        all_similar: Dict[int, Dict] = {}
+        pool = _component_executor()
+        cb_future = ib_future = None
+        if self.content_weight > 0 and self.content_model is not None:
+            cb_future = pool.submit(self.content_model.get_similar_movies, movie_id, n=n*2)
+        if self.item_weight > 0 and self.item_model is not None:
+            ib_future = pool.submit(self.item_model.get_similar_items, movie_id, n=n*2)
         
-        # Content-based similar
-        if self.content_model is not None:
-            cb_similar = self.content_model.get_similar_movies(movie_id, n=n*2)
-            for movie in cb_similar:
-                mid = movie['movieId']
-                if mid not in all_similar:
-                    all_similar[mid] = {
-                        'movieId': mid,
-                        'title': movie['title'],
-                        'genres': movie['genres'],
-                        'avgRating': movie.get('avgRating', 0),
-                        'similarities': {}
-                    }
-                all_similar[mid]['similarities']['content'] = movie['similarity']
-        
-        # Item-based similar
-        if self.item_model is not None:
-            ib_similar = self.item_model.get_similar_items(movie_id, n=n*2)
-            for movie in ib_similar:
-                mid = movie['movieId']
-                if mid not in all_similar:
-                    all_similar[mid] = {
-                        'movieId': mid,
-                        'title': movie['title'],
-                        'genres': movie.get('genres', []),
-                        'avgRating': movie.get('avgRating', 0),
-                        'similarities': {}
-                    }
-                all_similar[mid]['similarities']['item'] = movie['similarity']
+        cb_similar = cb_future.result() if cb_future is not None else []
+        ib_similar = ib_future.result() if ib_future is not None else []
+        
+        candidates = cb_similar + ib_similar
+        if not candidates:
+            return []
+        
+        # Weighted mean of the content and item similarities per movie
+        movie_ids = np.fromiter((m['movieId'] for m in candidates), dtype=np.int64, count=len(candidates))
+        similarities = np.fromiter((m['similarity'] for m in candidates), dtype=np.float64, count=len(candidates))
+        weights = np.repeat(self._weights[:2], [len(cb_similar), len(ib_similar)])
+        _, first_seen, _, hybrid_sims = self._weighted_merge(movie_ids, similarities, weights)
+        
+        # Sort by hybrid similarity, then by first appearance
+        order = np.lexsort((first_seen, -hybrid_sims))[:n]
         
-        # Compute hybrid similarity
         results = []
-        for mid, data in all_similar.items():
-            sims = data['similarities']
-            
-            hybrid_sim = 0
-            weight_sum = 0
-            
-            if 'content' in sims:
-                hybrid_sim += sims['content'] * self.content_weight
-                weight_sum += self.content_weight
-            if 'item' in sims:
-                hybrid_sim += sims['item'] * self.item_weight
-                weight_sum += self.item_weight
-            
-            if weight_sum > 0:
-                hybrid_sim /= weight_sum
-            
+        for g in order.tolist():
+            movie = candidates[first_seen[g]]
             results.append({
-                'movieId': mid,
-                'title': data['title'],
-                'genres': data['genres'],
-                'avgRating': data['avgRating'],
-                'similarity': float(hybrid_sim),
+                'movieId': movie['movieId'],
+                'title': movie['title'],
+                'genres': movie.get('genres', []),
+                'avgRating': movie.get('avgRating', 0),
+                'similarity': float(hybrid_sims[g]),
                 'method': 'hybrid'
             })
         
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        return results[:n]
+        return results
     
     def explain_recommendation(self, user_id: int, movie_id: int,
                                user_rated_movies: Optional[List[Dict]] = None) -> Dict:
@@ -355,27 +413,38 @@ class HybridModel:
         
         # Content-based explanation
         if self.content_model is not None and user_rated_movies:
-            # Find which rated movies are similar
+            # Find which rated movies are similar, computing just those
+            # similarities in one product instead of a lookup per rated movie
             similar_rated = []
-            for rated in user_rated_movies:
-                if rated['movieId'] in self.content_model.movie_id_to_idx:
-                    rated_idx = self.content_model.movie_id_to_idx[rated['movieId']]
-                    movie_idx = self.content_model.movie_id_to_idx.get(movie_id)
-                    if movie_idx is not None:
-                        sim = self.content_model.similarity_matrix[movie_idx, rated_idx]
-                        if sim > 0.1:
-                            similar_rated.append({
-                                'movieId': rated['movieId'],
-                                'similarity': float(sim),
-                                'rating': rated['rating']
-                            })
+            n_similar = 0
+            movie_idx = self.content_model.movie_id_to_idx.get(movie_id)
+            if movie_idx is not None:
+                idx_map = self.content_model.movie_id_to_idx
+                rated_idxs = np.fromiter(
+                    (idx_map.get(rated['movieId'], -1) for rated in user_rated_movies),
+                    dtype=np.int64, count=len(user_rated_movies)
+                )
+                positions = np.flatnonzero(rated_idxs >= 0)
+                sims = self.content_model._similarity_entries(movie_idx, rated_idxs[positions])
+                
+                keep = sims > 0.1
+                positions, sims = positions[keep], sims[keep]
+                order = np.argsort(-sims, kind='stable')[:5]
+                n_similar = len(sims)
+                similar_rated = [
+                    {
+                        'movieId': user_rated_movies[pos]['movieId'],
+                        'similarity': float(sim),
+                        'rating': user_rated_movies[pos]['rating']
+                    }
+                    for pos, sim in zip(positions[order].tolist(), sims[order].tolist())
+                ]
             
-            similar_rated.sort(key=lambda x: x['similarity'], reverse=True)
             explanation['methods'].append({
                 'method': 'content_based',
                 'weight': self.content_weight,
-                'reason': f'Similar to {len(similar_rated)} movies you liked',
-                'similar_movies': similar_rated[:5]
+                'reason': f'Similar to {n_similar} movies you liked',
+                'similar_movies': similar_rated
             })
         
         # Item-based explanation
@@ -403,15 +472,33 @@ class HybridModel:
         
         return explanation
     
+    @staticmethod
+    def _group_ratings_by_user(ratings_df: Optional['pd.DataFrame']) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """Split ratings into per-user (movie IDs, ratings) arrays in one pass."""
+        if ratings_df is None or len(ratings_df) == 0:
+            return {}
+        
+        user_ids = ratings_df['userId'].to_numpy()
+        order = np.argsort(user_ids, kind='stable')
+        movie_ids = ratings_df['movieId'].to_numpy()[order]
+        ratings = ratings_df['rating'].to_numpy(dtype=np.float64)[order]
+        
+        users, starts = np.unique(user_ids[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        return {
+            int(uid): (movie_ids[start:end], ratings[start:end])
+            for uid, start, end in zip(users, starts, ends)
+        }
+    
     def _get_user_ratings(self, user_id: int) -> List[Dict]:
-        """Get user's ratings from dataframe."""
-        if self.ratings_df is None:
+        """Get user's ratings from the per-user arrays built in fit."""
+        if user_id not in self._ratings_by_user:
             return []
         
-        user_ratings = self.ratings_df[self.ratings_df['userId'] == user_id]
+        movie_ids, ratings = self._ratings_by_user[user_id]
         return [
-            {'movieId': int(row['movieId']), 'rating': float(row['rating'])}
-            for _, row in user_ratings.iterrows()
+            {'movieId': movie_id, 'rating': rating}
+            for movie_id, rating in zip(movie_ids.tolist(), ratings.tolist())
         ]
     
     def set_weights(self, content_weight: float, 
@@ -424,8 +511,11 @@ class HybridModel:
             content_weight: Weight for content-based
             item_weight: Weight for item-based
             user_weight: Weight for user-based
+            
+        A weight of exactly 0 skips that component entirely.
         """
         total = content_weight + item_weight + user_weight
         self.content_weight = content_weight / total
         self.item_weight = item_weight / total
         self.user_weight = user_weight / total
+        self._weights = np.array([self.content_weight, self.item_weight, self.user_weight])
@@ -3,39 +3,116 @@ Item-Based Collaborative Filtering recommendation model.
 Finds similar items based on user rating patterns.
 """
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Optional, Set, Tuple
+from typing import TYPE_CHECKING, List, Dict, Optional, Set, Tuple
 from scipy import sparse
-from sklearn.metrics.pairwise import cosine_similarity
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import numba
+except ImportError:  # Numba is optional; the kernel then runs as plain Python
+    numba = None
+
+from app.models.content_based import _top_k_indices
+
+
+def _weighted_top_k(similarities, values, k):
+    """
+    Similarity-weighted mean of values over the k most similar neighbours.
+    
+    Only positive similarities contribute; returns NaN when none do.
+    """
+    if similarities.shape[0] > k:
+        top = np.argsort(-similarities)[:k]
+        similarities = similarities[top]
+        values = values[top]
+    numerator = 0.0
+    denominator = 0.0
+    for i in range(similarities.shape[0]):
+        similarity = similarities[i]
+        if similarity > 0:
+            numerator += similarity * values[i]
+            denominator += similarity
+    if denominator > 0:
+        return numerator / denominator
+    return np.nan
+
+
+if numba is not None:
+    # nogil lets concurrent request threads run the kernel on separate cores
+    _weighted_top_k = numba.njit(cache=True, nogil=True)(_weighted_top_k)
+
+
+def _save_sparse(path: str, name: str, matrix) -> None:
+    """Write a CSR/CSC matrix's component arrays as name_{data,indices,indptr}.npy."""
+    import os
+    # Saved in canonical form, so scipy never needs to sort a read-only map in place
+    if not matrix.has_canonical_format:
+        matrix = matrix.copy()
+        matrix.sum_duplicates()
+    for part in ('data', 'indices', 'indptr'):
+        np.save(os.path.join(path, f'{name}_{part}.npy'), getattr(matrix, part))
+
+
+def _load_sparse(path: str, name: str, shape: Tuple[int, int], matrix_class,
+                 mmap_mode: Optional[str]):
+    """Rebuild a matrix written by _save_sparse around (memory-mapped) arrays."""
+    import os
+    data, indices, indptr = (
+        np.load(os.path.join(path, f'{name}_{part}.npy'), mmap_mode=mmap_mode)
+        for part in ('data', 'indices', 'indptr')
+    )
+    return matrix_class((data, indices, indptr), shape=shape, copy=False)
 
 
 class ItemBasedModel:
     """Item-Based Collaborative Filtering using rating patterns."""
     
-    def __init__(self, k: int = 20, min_ratings: int = 5):
+    def __init__(self, k: int = 20, min_ratings: int = 5,
+                 max_neighbors: Optional[int] = None, mean_centered: bool = False):
         """
         Initialize the item-based model.
         
         Args:
             k: Number of similar items to consider
             min_ratings: Minimum ratings required for an item
+            max_neighbors: Keep only this many most similar items per item
+                           (None keeps every co-rated pair)
+            mean_centered: Predict from deviations around item means, matching
+                           the centering the similarity is computed on
         """
         self.k = k
         self.min_ratings = min_ratings
-        self.ratings_df: Optional[pd.DataFrame] = None
-        self.movies_df: Optional[pd.DataFrame] = None
-        self.item_similarity: Optional[np.ndarray] = None
-        self.user_item_matrix: Optional[np.ndarray] = None
+        self.max_neighbors = max_neighbors
+        self.mean_centered = mean_centered
+        self.ratings_df: Optional['pd.DataFrame'] = None
+        self.movies_df: Optional['pd.DataFrame'] = None
+        # Sparse item-item similarity; pairs without co-ratings are not stored
+        self.item_similarity: Optional[sparse.csr_matrix] = None
+        # Positive part of the similarity, transposed and kept as CSR so
+        # recommend_batch multiplies against it without rebuilding it
+        self._positive_similarity_T: Optional[sparse.csr_matrix] = None
+        # Mean observed rating per item, and the per-item offset predictions
+        # are made around (the means when mean_centered, else zeros)
+        self.item_means: Optional[np.ndarray] = None
+        self._baseline: Optional[np.ndarray] = None
+        # Ratings stay sparse: CSR for user rows, CSC for item columns
+        self.user_item_csr: Optional[sparse.csr_matrix] = None
+        self.user_item_csc: Optional[sparse.csc_matrix] = None
         self.user_ids: List[int] = []
         self.movie_ids: List[int] = []
         self.movie_to_idx: Dict[int, int] = {}
         self.idx_to_movie: Dict[int, int] = {}
         self.user_to_idx: Dict[int, int] = {}
         self.idx_to_user: Dict[int, int] = {}
+        # movieId -> (title, genres, avgRating) and the cold-start order, built in fit
+        self._movie_info: Dict[int, Tuple] = {}
+        self._popular_ids: List[int] = []
         self.is_fitted: bool = False
     
-    def fit(self, ratings_df: pd.DataFrame,
-            movies_df: Optional[pd.DataFrame] = None) -> 'ItemBasedModel':
+    def fit(self, ratings_df: 'pd.DataFrame',
+            movies_df: Optional['pd.DataFrame'] = None) -> 'ItemBasedModel':
         """
         Fit the model with ratings data.
         
@@ -46,37 +123,39 @@ class ItemBasedModel:
         Returns:
             Self for chaining
         """
+        import pandas as pd
+        
         self.ratings_df = ratings_df
         self.movies_df = movies_df
         
-        # Filter items with minimum ratings
-        item_counts = ratings_df.groupby('movieId').size()
-        valid_items = item_counts[item_counts >= self.min_ratings].index
-        filtered_df = ratings_df[ratings_df['movieId'].isin(valid_items)]
+        # Filter items with minimum ratings (one count pass, one mask)
+        item_counts = ratings_df['movieId'].value_counts()
+        filtered_df = ratings_df.loc[ratings_df['movieId'].map(item_counts).ge(self.min_ratings)]
         
-        # Create user-item matrix
-        self.user_ids = sorted(filtered_df['userId'].unique())
-        self.movie_ids = sorted(filtered_df['movieId'].unique())
+        # Encode users and movies as sorted integer codes in one C pass
+        rows, user_uniques = pd.factorize(filtered_df['userId'], sort=True)
+        cols, movie_uniques = pd.factorize(filtered_df['movieId'], sort=True)
+        self.user_ids = user_uniques.tolist()
+        self.movie_ids = movie_uniques.tolist()
         
-        for idx, uid in enumerate(self.user_ids):
-            self.user_to_idx[uid] = idx
-            self.idx_to_user[idx] = uid
+        self.user_to_idx = dict(zip(self.user_ids, range(len(self.user_ids))))
+        self.idx_to_user = dict(enumerate(self.user_ids))
+        self.movie_to_idx = dict(zip(self.movie_ids, range(len(self.movie_ids))))
+        self.idx_to_movie = dict(enumerate(self.movie_ids))
         
-        for idx, mid in enumerate(self.movie_ids):
-            self.movie_to_idx[mid] = idx
-            self.idx_to_movie[idx] = mid
+        self._build_movie_lookup(movies_df)
         
         # Build sparse matrix
         n_users = len(self.user_ids)
         n_items = len(self.movie_ids)
         
-        rows = filtered_df['userId'].map(self.user_to_idx).values
-        cols = filtered_df['movieId'].map(self.movie_to_idx).values
-        data = filtered_df['rating'].values
+        # Ratings are half-star steps, so float32 holds them exactly
+        data = filtered_df['rating'].to_numpy(dtype=np.float32)
         
-        self.user_item_matrix = sparse.csr_matrix(
+        self.user_item_csr = sparse.csr_matrix(
             (data, (rows, cols)), shape=(n_users, n_items)
-        ).toarray()
+        )
+        self.user_item_csc = self.user_item_csr.tocsc()
         
         # Compute item-item similarity
         self._compute_item_similarity()
@@ -85,24 +164,56 @@ class ItemBasedModel:
         return self
     
     def _compute_item_similarity(self) -> None:
-        """Compute item-item cosine similarity matrix."""
-        # Transpose to get item-user matrix
-        item_user_matrix = self.user_item_matrix.T
-        
-        # Replace 0s with NaN for mean calculation
-        item_user_matrix = np.where(
-            item_user_matrix == 0, np.nan, item_user_matrix
-        )
-        
-        # Mean center the ratings
-        item_means = np.nanmean(item_user_matrix, axis=1, keepdims=True)
-        item_user_centered = np.nan_to_num(item_user_matrix - item_means)
-        
-        # Compute cosine similarity
-        self.item_similarity = cosine_similarity(item_user_centered)
+        """Compute item-item cosine similarity on mean-centered ratings."""
+        # Item-user matrix; only observed ratings are stored
+        item_user = self.user_item_csc.T.tocsr().astype(np.float32)
+        item_user.eliminate_zeros()
+        
+        # Mean center the observed ratings of each item
+        counts = np.diff(item_user.indptr)
+        entry_rows = np.repeat(np.arange(len(counts)), counts)
+        sums = np.asarray(item_user.sum(axis=1)).ravel()
+        item_means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        item_user.data -= item_means[entry_rows]
+        self.item_means = item_means
+        self._baseline = item_means if self.mean_centered else np.zeros_like(item_means)
+        
+        # Scale each item vector to unit length once; the Gram matrix of
+        # the scaled rows is then the cosine similarity, kept sparse
+        norms = np.sqrt(np.bincount(entry_rows, weights=item_user.data ** 2, minlength=len(counts)))
+        inv_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        item_user.data *= inv_norms[entry_rows].astype(np.float32)
+        similarity = (item_user @ item_user.T).tocsr()
         
         # Zero out diagonal
-        np.fill_diagonal(self.item_similarity, 0)
+        similarity = similarity - sparse.diags(similarity.diagonal(), format='csr')
+        similarity.eliminate_zeros()
+        
+        # Optionally bound memory to O(n_items * max_neighbors)
+        if self.max_neighbors is not None:
+            similarity = self._prune_neighbors(similarity, self.max_neighbors)
+        self.item_similarity = similarity.astype(np.float32, copy=False)
+        self._build_positive_similarity()
+    
+    def _build_positive_similarity(self) -> None:
+        """Precompute the transposed positive similarity for recommend_batch."""
+        similarity = self.item_similarity
+        self._positive_similarity_T = similarity.multiply(similarity > 0).T.tocsr()
+    
+    @staticmethod
+    def _prune_neighbors(similarity: sparse.csr_matrix, m: int) -> sparse.csr_matrix:
+        """Keep the m largest similarities in each row of a CSR matrix."""
+        similarity = similarity.copy()
+        indptr = similarity.indptr
+        for row in np.flatnonzero(np.diff(indptr) > m):
+            row_data = similarity.data[indptr[row]:indptr[row + 1]]
+            row_data[np.argpartition(-row_data, m - 1)[m:]] = 0
+        similarity.eliminate_zeros()
+        return similarity
+    
+    def _similarity_row(self, idx: int) -> np.ndarray:
+        """Dense similarity row of one item against all items."""
+        return self.item_similarity[idx].toarray().ravel()
     
     def get_similar_items(self, movie_id: int, n: int = 10) -> List[Dict]:
         """
@@ -119,10 +230,10 @@ class ItemBasedModel:
             return []
         
         idx = self.movie_to_idx[movie_id]
-        similarities = self.item_similarity[idx]
+        similarities = self._similarity_row(idx)
         
         # Get top-n similar items
-        similar_indices = np.argsort(similarities)[::-1][:n]
+        similar_indices = _top_k_indices(similarities, n)
         
         results = []
         for sim_idx in similar_indices:
@@ -154,38 +265,63 @@ class ItemBasedModel:
         user_idx = self.user_to_idx[user_id]
         movie_idx = self.movie_to_idx[movie_id]
         
-        # Get user's ratings
-        user_ratings = self.user_item_matrix[user_idx]
-        rated_mask = user_ratings > 0
+        # Get user's ratings straight from the sparse row
+        rated_indices, rated_values = self._user_row(user_idx)
         
-        if not np.any(rated_mask):
+        if len(rated_indices) == 0:
             return None
         
-        # Get similarities to rated items
-        similarities = self.item_similarity[movie_idx]
-        
-        # Use top-k similar items that user has rated
-        rated_indices = np.where(rated_mask)[0]
-        rated_similarities = similarities[rated_indices]
+        # Only the stored neighbours of the movie can carry a positive
+        # similarity, so intersect its sparse row with the rated items
+        # instead of reading a dense item-wide row
+        start, end = self.item_similarity.indptr[movie_idx:movie_idx + 2]
+        neighbor_indices = self.item_similarity.indices[start:end]
+        neighbor_similarities = self.item_similarity.data[start:end]
+        _, neighbor_pos, rated_pos = np.intersect1d(
+            neighbor_indices, rated_indices, assume_unique=True, return_indices=True
+        )
         
-        # Get top-k
-        if len(rated_indices) > self.k:
-            top_k_indices = np.argsort(rated_similarities)[::-1][:self.k]
-            rated_indices = rated_indices[top_k_indices]
-            rated_similarities = rated_similarities[top_k_indices]
+        # Weighted mean over the top-k positive ones (a compiled kernel
+        # when Numba is available)
+        rated_pos_indices = rated_indices[rated_pos]
+        predicted = _weighted_top_k(neighbor_similarities[neighbor_pos],
+                                    rated_values[rated_pos] - self._baseline[rated_pos_indices],
+                                    self.k)
         
-        # Weighted average
-        pos_mask = rated_similarities > 0
-        if not np.any(pos_mask):
+        if np.isnan(predicted):
             return None
+        predicted += self._baseline[movie_idx]
         
-        weights = rated_similarities[pos_mask]
-        ratings = user_ratings[rated_indices[pos_mask]]
-        
-        predicted = np.sum(weights * ratings) / np.sum(weights)
+        # Clip to valid range without a 0-d array round-trip
+        return 0.5 if predicted < 0.5 else 5.0 if predicted > 5.0 else float(predicted)
+    
+    def predict_ratings(self, user_id: int, movie_ids: List[int]) -> List[Optional[float]]:
+        """
+        Predict ratings for one user and several movies in one pass.
         
-        # Clip to valid range
-        return float(np.clip(predicted, 0.5, 5.0))
+        Args:
+            user_id: User ID
+            movie_ids: Movie IDs to predict ratings for
+            
+        Returns:
+            Predicted rating or None per movie, in the order of movie_ids
+        """
+        predictions: List[Optional[float]] = [None] * len(movie_ids)
+        if not self.is_fitted or user_id not in self.user_to_idx:
+            return predictions
+        
+        positions = [i for i, m in enumerate(movie_ids) if m in self.movie_to_idx]
+        if not positions:
+            return predictions
+        item_indices = np.array([self.movie_to_idx[movie_ids[i]] for i in positions])
+        
+        rated_indices, rated_values = self._user_row(self.user_to_idx[user_id])
+        scores = np.clip(self._predict_scores(rated_indices, rated_values, item_indices), 0.5, 5.0)
+        
+        for i, score in zip(positions, scores.tolist()):
+            if not np.isnan(score):
+                predictions[i] = score
+        return predictions
     
     def recommend(self, user_id: int, n: int = 10,
                   exclude: Optional[Set[int]] = None) -> List[Dict]:
@@ -210,107 +346,282 @@ class ItemBasedModel:
             return self._get_popular_items(n, exclude)
         
         user_idx = self.user_to_idx[user_id]
-        user_ratings = self.user_item_matrix[user_idx]
+        rated_indices, rated_values = self._user_row(user_idx)
         
-        # Add already rated movies to exclude
-        rated_indices = np.where(user_ratings > 0)[0]
-        rated_movie_ids = {self.idx_to_movie[idx] for idx in rated_indices}
-        exclude = exclude.union(rated_movie_ids)
+        scores = self._predict_scores(rated_indices, rated_values)
         
-        # Predict ratings for unrated movies
-        predictions = []
-        for movie_idx in range(len(self.movie_ids)):
-            movie_id = self.idx_to_movie[movie_idx]
+        return self._top_recommendations(scores, rated_indices, exclude, n)
+    
+    def recommend_batch(self, user_ids: List[int], n: int = 10,
+                        exclude_per_user: Optional[Dict[int, Set[int]]] = None) -> List[List[Dict]]:
+        """
+        Recommend movies for several users at once.
+        
+        Users with at most k ratings use all of their rated items as
+        neighbours, so their predictions for every item come from a single
+        sparse matrix product over the whole batch. Heavier users fall
+        back to the per-user top-k path.
+        
+        Args:
+            user_ids: User IDs
+            n: Number of recommendations per user
+            exclude_per_user: Movie IDs to exclude, keyed by user ID
             
-            if movie_id in exclude:
+        Returns:
+            Recommendation lists in the same order as user_ids
+        """
+        if not self.is_fitted:
+            return [[] for _ in user_ids]
+        
+        exclude_per_user = exclude_per_user or {}
+        
+        # Users whose neighbour set is simply everything they rated
+        rating_counts = np.diff(self.user_item_csr.indptr)
+        light_users = [uid for uid in user_ids
+                       if uid in self.user_to_idx
+                       and rating_counts[self.user_to_idx[uid]] <= self.k]
+        
+        batch_scores: Dict[int, np.ndarray] = {}
+        if light_users:
+            batch_idxs = np.array([self.user_to_idx[uid] for uid in light_users])
+            R = self.user_item_csr[batch_idxs]
+            rated = (R != 0).astype(self.item_similarity.dtype)
+            R.data -= self._baseline[R.indices]
+            # R @ S+.T sums S+[i, j] * r_j over rated j (pruned S+ is not symmetric)
+            if getattr(self, '_positive_similarity_T', None) is None:
+                self._build_positive_similarity()
+            positive = self._positive_similarity_T
+            numerator = (R @ positive).toarray()
+            denominator = (rated @ positive).toarray()
+            predictions = np.divide(numerator, denominator,
+                                    out=np.full(numerator.shape, np.nan),
+                                    where=denominator > 0)
+            predictions += self._baseline
+            batch_scores = dict(zip(light_users, predictions))
+        
+        results = []
+        for uid in user_ids:
+            exclude = exclude_per_user.get(uid) or set()
+            if uid not in self.user_to_idx:
+                results.append(self._get_popular_items(n, exclude))
                 continue
             
-            pred = self._predict_for_idx(user_idx, movie_idx, user_ratings, rated_indices)
-            if pred is not None:
-                predictions.append((movie_id, pred))
+            rated_indices, rated_values = self._user_row(self.user_to_idx[uid])
+            scores = batch_scores.get(uid)
+            if scores is None:
+                scores = self._predict_scores(rated_indices, rated_values)
+            results.append(self._top_recommendations(scores, rated_indices, exclude, n))
         
-        # Sort by predicted rating
-        predictions.sort(key=lambda x: x[1], reverse=True)
+        return results
+    
+    def _top_recommendations(self, scores: np.ndarray, rated_indices: np.ndarray,
+                             exclude: Set[int], n: int) -> List[Dict]:
+        """Top-n predicted items that the user has not rated or excluded."""
+        # Candidates are predicted items the user has not rated and that are not excluded
+        candidate_mask = ~np.isnan(scores)
+        candidate_mask[rated_indices] = False
+        for movie_id in exclude:
+            if movie_id in self.movie_to_idx:
+                candidate_mask[self.movie_to_idx[movie_id]] = False
+        ranked = np.where(candidate_mask, scores, -np.inf)
+        
+        # Partial sort for the top-n
+        top_indices = _top_k_indices(ranked, n)
+        top_indices = top_indices[candidate_mask[top_indices]]
         
-        # Return top-n
         results = []
-        for movie_id, score in predictions[:n]:
-            movie_info = self._get_movie_info(movie_id)
-            movie_info['score'] = float(score)
+        for movie_idx in top_indices:
+            movie_info = self._get_movie_info(self.idx_to_movie[movie_idx])
+            movie_info['score'] = float(scores[movie_idx])
             movie_info['method'] = 'item_based'
             results.append(movie_info)
         
         return results
     
-    def _predict_for_idx(self, user_idx: int, movie_idx: int,
-                         user_ratings: np.ndarray,
-                         rated_indices: np.ndarray) -> Optional[float]:
-        """Internal prediction method using indices."""
+    def _user_row(self, user_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (item indices, ratings) of a user's stored ratings."""
+        start, end = self.user_item_csr.indptr[user_idx:user_idx + 2]
+        return (self.user_item_csr.indices[start:end],
+                self.user_item_csr.data[start:end])
+    
+    def _predict_scores(self, rated_indices: np.ndarray, rated_values: np.ndarray,
+                        item_indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Predict a user's rating for every item in one batched pass.
+        
+        Each prediction is the similarity-weighted mean over the k rated
+        items most similar to the target, counting positive similarities only
+        (taken over deviations from item means when mean_centered).
+        
+        Args:
+            rated_indices: Item indices the user has rated
+            rated_values: The user's ratings for those items
+            item_indices: Target item indices (None predicts every item)
+            
+        Returns:
+            Predicted ratings per target item (NaN where no prediction is possible)
+        """
+        if item_indices is None:
+            target_similarity = self.item_similarity
+            baseline = self._baseline
+        else:
+            target_similarity = self.item_similarity[item_indices]
+            baseline = self._baseline[item_indices]
+        n_items = target_similarity.shape[0]
         if len(rated_indices) == 0:
-            return None
+            return np.full(n_items, np.nan)
         
-        similarities = self.item_similarity[movie_idx, rated_indices]
+        # Similarities of every target item to the user's rated items
+        similarities = target_similarity[:, rated_indices].toarray()
+        rated_values = rated_values - self._baseline[rated_indices]
+        values = np.broadcast_to(rated_values, similarities.shape)
         
-        # Get top-k similar items
+        # Keep the top-k rated neighbours of each item
         if len(rated_indices) > self.k:
-            top_k_pos = np.argsort(similarities)[::-1][:self.k]
-            similarities = similarities[top_k_pos]
-            rated_indices = rated_indices[top_k_pos]
+            top_k = np.argpartition(-similarities, self.k - 1, axis=1)[:, :self.k]
+            similarities = np.take_along_axis(similarities, top_k, axis=1)
+            values = rated_values[top_k]
         
-        pos_mask = similarities > 0
-        if not np.any(pos_mask):
-            return None
+        weights = np.where(similarities > 0, similarities, 0.0)
+        numerator = (weights * values).sum(axis=1)
+        denominator = weights.sum(axis=1)
         
-        weights = similarities[pos_mask]
-        ratings = user_ratings[rated_indices[pos_mask]]
-        
-        return float(np.sum(weights * ratings) / np.sum(weights))
+        scores = np.divide(numerator, denominator,
+                           out=np.full(n_items, np.nan), where=denominator > 0)
+        return scores + baseline
+    
+    def _build_movie_lookup(self, movies_df: Optional['pd.DataFrame']) -> None:
+        """Index movie details by ID and precompute the popularity order."""
+        self._movie_info = {}
+        self._popular_ids = []
+        if movies_df is None:
+            return
+        
+        movies = movies_df.drop_duplicates('movieId')
+        movie_ids = movies['movieId'].tolist()
+        titles = (movies['title'].tolist() if 'title' in movies.columns
+                  else [f'Movie {m}' for m in movie_ids])
+        genres = (movies['genres'].tolist() if 'genres' in movies.columns
+                  else [[] for _ in movie_ids])
+        avg_ratings = (movies['avgRating'].astype(float).tolist() if 'avgRating' in movies.columns
+                       else [0.0] * len(movie_ids))
+        self._movie_info = dict(zip(movie_ids, zip(titles, genres, avg_ratings)))
+        
+        sorted_df = movies_df.sort_values(by='avgRating', ascending=False)
+        self._popular_ids = [m for m in sorted_df['movieId'].tolist() if m in self.movie_to_idx]
     
     def _get_movie_info(self, movie_id: int) -> Dict:
         """Get movie information."""
-        info = {
+        if movie_id not in self._movie_info:
+            return {
+                'movieId': int(movie_id),
+                'title': f'Movie {movie_id}',
+                'genres': [],
+                'avgRating': 0.0
+            }
+        
+        title, genres, avg_rating = self._movie_info[movie_id]
+        return {
             'movieId': int(movie_id),
-            'title': f'Movie {movie_id}',
-            'genres': [],
-            'avgRating': 0.0
+            'title': title,
+            'genres': genres,
+            'avgRating': avg_rating
         }
-        
-        if self.movies_df is not None:
-            movie_row = self.movies_df[self.movies_df['movieId'] == movie_id]
-            if not movie_row.empty:
-                row = movie_row.iloc[0]
-                info['title'] = row.get('title', info['title'])
-                info['genres'] = row.get('genres', [])
-                info['avgRating'] = float(row.get('avgRating', 0))
-        
-        return info
     
     def _get_popular_items(self, n: int, exclude: Set[int]) -> List[Dict]:
         """Get popular items for cold start."""
-        if self.movies_df is not None:
-            sorted_df = self.movies_df.sort_values(
-                by='avgRating', ascending=False
-            )
+        results = []
+        for movie_id in self._popular_ids:
+            if movie_id in exclude:
+                continue
             
-            results = []
-            for _, row in sorted_df.iterrows():
-                if row['movieId'] in exclude:
-                    continue
-                if row['movieId'] not in self.movie_to_idx:
-                    continue
-                
-                results.append({
-                    'movieId': int(row['movieId']),
-                    'title': row['title'],
-                    'genres': row.get('genres', []),
-                    'avgRating': float(row.get('avgRating', 0)),
-                    'score': float(row.get('avgRating', 0)),
-                    'method': 'popular'
-                })
-                
-                if len(results) >= n:
-                    break
+            movie_info = self._get_movie_info(movie_id)
+            movie_info['score'] = movie_info['avgRating']
+            movie_info['method'] = 'popular'
+            results.append(movie_info)
             
-            return results
+            if len(results) >= n:
+                break
+        
+        return results
+    
+    _SPARSE_FILES = {
+        'user_item_csr': sparse.csr_matrix,
+        'user_item_csc': sparse.csc_matrix,
+        'item_similarity': sparse.csr_matrix,
+    }
+    
+    def save(self, path: str) -> None:
+        """
+        Persist the fitted model to a directory.
+        
+        Rating and similarity matrices and the per-item means go to .npy
+        files; hyperparameters and movie details are pickled.
+        
+        Args:
+            path: Directory to write the model files to
+        """
+        import os
+        import pickle
         
-        return []
+        if not self.is_fitted:
+            raise RuntimeError("Model not fitted. Call fit() first.")
+        
+        os.makedirs(path, exist_ok=True)
+        for name in self._SPARSE_FILES:
+            _save_sparse(path, name, getattr(self, name))
+        np.save(os.path.join(path, 'item_means.npy'), self.item_means)
+        
+        meta = {
+            'params': {'k': self.k, 'min_ratings': self.min_ratings,
+                       'max_neighbors': self.max_neighbors,
+                       'mean_centered': self.mean_centered},
+            'shapes': {name: getattr(self, name).shape for name in self._SPARSE_FILES},
+            'user_ids': self.user_ids,
+            'movie_ids': self.movie_ids,
+            'movie_info': self._movie_info,
+            'popular_ids': self._popular_ids,
+        }
+        with open(os.path.join(path, 'meta.pkl'), 'wb') as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> 'ItemBasedModel':
+        """
+        Load a model written by save().
+        
+        Arrays are memory-mapped read-only by default, so loading does not
+        copy them and worker processes share their pages.
+        
+        Args:
+            path: Directory the model was saved to
+            mmap_mode: numpy mmap mode for the arrays (None reads them into memory)
+            
+        Returns:
+            Fitted ItemBasedModel
+        """
+        import os
+        import pickle
+        
+        with open(os.path.join(path, 'meta.pkl'), 'rb') as f:
+            meta = pickle.load(f)
+        
+        model = cls(**meta['params'])
+        for name, matrix_class in cls._SPARSE_FILES.items():
+            setattr(model, name, _load_sparse(path, name, meta['shapes'][name],
+                                              matrix_class, mmap_mode))
+        model.item_means = np.load(os.path.join(path, 'item_means.npy'), mmap_mode=mmap_mode)
+        model._baseline = (model.item_means if model.mean_centered
+                           else np.zeros_like(model.item_means))
+        model._build_positive_similarity()
+        
+        model.user_ids = meta['user_ids']
+        model.movie_ids = meta['movie_ids']
+        model.user_to_idx = dict(zip(model.user_ids, range(len(model.user_ids))))
+        model.idx_to_user = dict(enumerate(model.user_ids))
+        model.movie_to_idx = dict(zip(model.movie_ids, range(len(model.movie_ids))))
+        model.idx_to_movie = dict(enumerate(model.movie_ids))
+        model._movie_info = meta['movie_info']
+        model._popular_ids = meta['popular_ids']
+        model.is_fitted = True
+        return model
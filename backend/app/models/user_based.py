@@ -3,40 +3,57 @@ User-Based Collaborative Filtering recommendation model.
 Finds similar users to make recommendations.
 """
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Optional, Set
+from typing import TYPE_CHECKING, List, Dict, Optional, Set, Tuple
 from scipy import sparse
-from sklearn.metrics.pairwise import cosine_similarity
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from app.models.content_based import _top_k_indices
+from app.models.item_based import ItemBasedModel, _weighted_top_k, _save_sparse, _load_sparse
+
+# Users per block when building the user-user similarity
+_SIMILARITY_BLOCK_ROWS = 512
 
 
 class UserBasedModel:
     """User-Based Collaborative Filtering using user similarity."""
     
-    def __init__(self, k: int = 20, min_common: int = 3):
+    def __init__(self, k: int = 20, min_common: int = 3,
+                 max_neighbors: Optional[int] = 100):
         """
         Initialize the user-based model.
         
         Args:
             k: Number of similar users to consider
             min_common: Minimum common rated items for similarity
+            max_neighbors: Keep only this many most similar users per user
+                           (None keeps every co-rated pair)
         """
         self.k = k
         self.min_common = min_common
-        self.ratings_df: Optional[pd.DataFrame] = None
-        self.movies_df: Optional[pd.DataFrame] = None
-        self.user_similarity: Optional[np.ndarray] = None
-        self.user_item_matrix: Optional[np.ndarray] = None
+        self.max_neighbors = max_neighbors
+        self.ratings_df: Optional['pd.DataFrame'] = None
+        self.movies_df: Optional['pd.DataFrame'] = None
+        # Sparse user-user neighbour graph; unstored pairs have similarity 0
+        self.user_similarity: Optional[sparse.csr_matrix] = None
+        # Ratings stay sparse: CSR for user rows, CSC for movie columns
+        self.user_item_csr: Optional[sparse.csr_matrix] = None
+        self.user_item_csc: Optional[sparse.csc_matrix] = None
         self.user_means: Optional[np.ndarray] = None
         self.user_ids: List[int] = []
         self.movie_ids: List[int] = []
         self.user_to_idx: Dict[int, int] = {}
         self.idx_to_user: Dict[int, int] = {}
+        # movieId -> (title, genres, avgRating) and the cold-start order, built in fit
+        self._movie_info: Dict[int, Tuple] = {}
+        self._popular_ids: List[int] = []
         self.movie_to_idx: Dict[int, int] = {}
         self.idx_to_movie: Dict[int, int] = {}
         self.is_fitted: bool = False
     
-    def fit(self, ratings_df: pd.DataFrame,
-            movies_df: Optional[pd.DataFrame] = None) -> 'UserBasedModel':
+    def fit(self, ratings_df: 'pd.DataFrame',
+            movies_df: Optional['pd.DataFrame'] = None) -> 'UserBasedModel':
         """
         Fit the model with ratings data.
         
@@ -47,32 +64,36 @@ class UserBasedModel:
         Returns:
             Self for chaining
         """
+        import pandas as pd
+        
         self.ratings_df = ratings_df
         self.movies_df = movies_df
         
-        # Create user-item matrix
-        self.user_ids = sorted(ratings_df['userId'].unique())
-        self.movie_ids = sorted(ratings_df['movieId'].unique())
+        # Encode users and movies as sorted integer codes in one C pass
+        rows, user_uniques = pd.factorize(ratings_df['userId'], sort=True)
+        cols, movie_uniques = pd.factorize(ratings_df['movieId'], sort=True)
+        self.user_ids = user_uniques.tolist()
+        self.movie_ids = movie_uniques.tolist()
         
-        for idx, uid in enumerate(self.user_ids):
-            self.user_to_idx[uid] = idx
-            self.idx_to_user[idx] = uid
+        self.user_to_idx = dict(zip(self.user_ids, range(len(self.user_ids))))
+        self.idx_to_user = dict(enumerate(self.user_ids))
+        self.movie_to_idx = dict(zip(self.movie_ids, range(len(self.movie_ids))))
+        self.idx_to_movie = dict(enumerate(self.movie_ids))
         
-        for idx, mid in enumerate(self.movie_ids):
-            self.movie_to_idx[mid] = idx
-            self.idx_to_movie[idx] = mid
+        self._build_movie_lookup(movies_df)
         
         # Build sparse matrix
         n_users = len(self.user_ids)
         n_items = len(self.movie_ids)
         
-        rows = ratings_df['userId'].map(self.user_to_idx).values
-        cols = ratings_df['movieId'].map(self.movie_to_idx).values
-        data = ratings_df['rating'].values
+        # Ratings are half-star steps, so float32 holds them exactly
+        data = ratings_df['rating'].to_numpy(dtype=np.float32)
         
-        self.user_item_matrix = sparse.csr_matrix(
+        self.user_item_csr = sparse.csr_matrix(
             (data, (rows, cols)), shape=(n_users, n_items)
-        ).toarray()
+        )
+        self.user_item_csr.eliminate_zeros()
+        self.user_item_csc = self.user_item_csr.tocsc()
         
         # Compute user means
         self._compute_user_means()
@@ -85,34 +106,62 @@ class UserBasedModel:
     
     def _compute_user_means(self) -> None:
         """Compute mean rating for each user."""
-        mask = self.user_item_matrix > 0
-        sums = np.sum(self.user_item_matrix, axis=1)
-        counts = np.sum(mask, axis=1)
+        # Row sums and stored-entry counts straight from the CSR arrays
+        sums = np.asarray(self.user_item_csr.sum(axis=1), dtype=np.float32).ravel()
+        counts = np.diff(self.user_item_csr.indptr)
         
         self.user_means = np.divide(
             sums, counts, 
-            out=np.full_like(sums, 3.0, dtype=float),
+            out=np.full_like(sums, 3.0),
             where=counts > 0
         )
     
     def _compute_user_similarity(self) -> None:
         """Compute user-user similarity using Pearson correlation."""
-        n_users = len(self.user_ids)
-        self.user_similarity = np.zeros((n_users, n_users))
-        
-        # Mean-center ratings
-        centered = self.user_item_matrix - self.user_means[:, np.newaxis]
-        centered = np.where(self.user_item_matrix > 0, centered, 0)
-        
-        # Compute cosine similarity on centered matrix
-        norms = np.linalg.norm(centered, axis=1, keepdims=True)
-        norms = np.where(norms > 0, norms, 1)
-        normalized = centered / norms
-        
-        self.user_similarity = normalized @ normalized.T
+        # Mean-center the stored ratings only (float32 keeps the product single precision)
+        centered = self.user_item_csr.astype(np.float32)
+        counts = np.diff(centered.indptr)
+        entry_rows = np.repeat(np.arange(len(counts)), counts)
+        centered.data -= self.user_means[entry_rows]
+        
+        # Scale each user vector to unit length; the Gram matrix of the
+        # scaled rows is the cosine similarity, computed sparse-sparse so
+        # its cost follows co-rated overlaps rather than n_items
+        norms = np.sqrt(np.bincount(entry_rows, weights=centered.data ** 2, minlength=len(counts)))
+        inv_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        centered.data *= inv_norms[entry_rows].astype(np.float32)
+        
+        # Build the neighbour graph one row block at a time, pruning each
+        # block before the next so the full n_users x n_users product
+        # never exists at once
+        n_users = len(counts)
+        centered_t = centered.T.tocsr()
+        blocks = []
+        for start in range(0, n_users, _SIMILARITY_BLOCK_ROWS):
+            stop = min(start + _SIMILARITY_BLOCK_ROWS, n_users)
+            block = (centered[start:stop] @ centered_t).tocsr()
+            
+            # Zero out diagonal
+            block_rows = np.repeat(np.arange(stop - start), np.diff(block.indptr))
+            block.data[block.indices == block_rows + start] = 0
+            block.eliminate_zeros()
+            
+            # Optionally bound memory to O(n_users * max_neighbors)
+            if self.max_neighbors is not None:
+                block = ItemBasedModel._prune_neighbors(block, self.max_neighbors)
+            blocks.append(block)
         
-        # Zero out diagonal
-        np.fill_diagonal(self.user_similarity, 0)
+        self.user_similarity = sparse.vstack(blocks, format='csr').astype(np.float32, copy=False)
+    
+    def _similarity_row(self, idx: int) -> np.ndarray:
+        """Dense similarity row of one user against all users."""
+        return self.user_similarity[idx].toarray().ravel()
+    
+    def _neighbors(self, user_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (user indices, similarities) of a user's stored neighbours."""
+        start, end = self.user_similarity.indptr[user_idx:user_idx + 2]
+        return (self.user_similarity.indices[start:end],
+                self.user_similarity.data[start:end])
     
     def get_similar_users(self, user_id: int, n: int = 10) -> List[Dict]:
         """
@@ -129,10 +178,10 @@ class UserBasedModel:
             return []
         
         user_idx = self.user_to_idx[user_id]
-        similarities = self.user_similarity[user_idx]
+        similarities = self._similarity_row(user_idx)
         
         # Get top-n similar users
-        similar_indices = np.argsort(similarities)[::-1][:n]
+        similar_indices = _top_k_indices(similarities, n)
         
         results = []
         for sim_idx in similar_indices:
@@ -164,38 +213,82 @@ class UserBasedModel:
         user_idx = self.user_to_idx[user_id]
         movie_idx = self.movie_to_idx[movie_id]
         
-        # Get users who rated this movie
-        rated_mask = self.user_item_matrix[:, movie_idx] > 0
-        rated_indices = np.where(rated_mask)[0]
+        # Users who rated this movie, read from the CSC column
+        start, end = self.user_item_csc.indptr[movie_idx:movie_idx + 2]
+        rated_indices = self.user_item_csc.indices[start:end]
+        rated_values = self.user_item_csc.data[start:end]
         
         if len(rated_indices) == 0:
-            return self.user_means[user_idx]
+            return float(self.user_means[user_idx])
         
-        # Get similarities
-        similarities = self.user_similarity[user_idx, rated_indices]
+        # Only stored neighbours can carry a positive similarity, so
+        # intersect them with the users who rated the movie
+        neighbor_indices, neighbor_similarities = self._neighbors(user_idx)
+        _, neighbor_pos, rated_pos = np.intersect1d(
+            neighbor_indices, rated_indices, assume_unique=True, return_indices=True
+        )
         
-        # Use top-k similar users
-        if len(rated_indices) > self.k:
-            top_k_pos = np.argsort(similarities)[::-1][:self.k]
-            similarities = similarities[top_k_pos]
-            rated_indices = rated_indices[top_k_pos]
+        # Similarity-weighted mean deviation over the top-k positive
+        # neighbours (a compiled kernel when Numba is available)
+        deviations = rated_values[rated_pos] - self.user_means[rated_indices[rated_pos]]
+        offset = _weighted_top_k(neighbor_similarities[neighbor_pos], deviations, self.k)
         
-        # Filter positive similarities
-        pos_mask = similarities > 0
-        if not np.any(pos_mask):
-            return self.user_means[user_idx]
+        if np.isnan(offset):
+            return float(self.user_means[user_idx])
+        predicted = self.user_means[user_idx] + offset
         
-        weights = similarities[pos_mask]
-        neighbor_indices = rated_indices[pos_mask]
+        # Clip to valid range without a 0-d array round-trip
+        return 0.5 if predicted < 0.5 else 5.0 if predicted > 5.0 else float(predicted)
+    
+    def predict_ratings(self, user_id: int, movie_ids: List[int]) -> List[Optional[float]]:
+        """
+        Predict ratings for one user and several movies in one pass.
         
-        # Compute weighted average of deviations from means
-        ratings = self.user_item_matrix[neighbor_indices, movie_idx]
-        neighbor_means = self.user_means[neighbor_indices]
-        deviations = ratings - neighbor_means
+        Args:
+            user_id: User ID
+            movie_ids: Movie IDs to predict ratings for
+            
+        Returns:
+            Predicted rating or None per movie, in the order of movie_ids
+        """
+        predictions: List[Optional[float]] = [None] * len(movie_ids)
+        if not self.is_fitted or user_id not in self.user_to_idx:
+            return predictions
         
-        predicted = self.user_means[user_idx] + np.sum(weights * deviations) / np.sum(weights)
+        positions = [i for i, m in enumerate(movie_ids) if m in self.movie_to_idx]
+        if not positions:
+            return predictions
+        item_indices = np.array([self.movie_to_idx[movie_ids[i]] for i in positions])
         
-        return float(np.clip(predicted, 0.5, 5.0))
+        user_idx = self.user_to_idx[user_id]
+        user_mean = self.user_means[user_idx]
+        
+        # Neighbour ratings for all target movies at once (neighbours x movies)
+        neighbor_indices, neighbor_similarities = self._neighbors(user_idx)
+        ratings = self.user_item_csr[neighbor_indices][:, item_indices].toarray()
+        rated = ratings != 0
+        similarities = np.where(rated, neighbor_similarities[:, np.newaxis], -np.inf)
+        deviations = np.where(rated, ratings - self.user_means[neighbor_indices][:, np.newaxis], 0.0)
+        
+        # Keep the top-k raters of each movie among the neighbours
+        if len(neighbor_indices) > self.k:
+            top_k = np.argpartition(-similarities, self.k - 1, axis=0)[:self.k]
+            similarities = np.take_along_axis(similarities, top_k, axis=0)
+            deviations = np.take_along_axis(deviations, top_k, axis=0)
+        
+        weights = np.where(similarities > 0, similarities, 0.0)
+        numerator = (weights * deviations).sum(axis=0)
+        denominator = weights.sum(axis=0)
+        
+        # Movies without a positive rater fall back to the user's mean
+        offsets = np.divide(numerator, denominator,
+                            out=np.zeros(len(item_indices)), where=denominator > 0)
+        scores = np.clip(user_mean + offsets, 0.5, 5.0)
+        scores[denominator <= 0] = user_mean
+        
+        for i, score in zip(positions, scores.tolist()):
+            predictions[i] = score
+        return predictions
     
     def recommend(self, user_id: int, n: int = 10,
                   exclude: Optional[Set[int]] = None) -> List[Dict]:
@@ -219,109 +312,192 @@ class UserBasedModel:
             return self._get_popular_items(n, exclude)
         
         user_idx = self.user_to_idx[user_id]
-        user_ratings = self.user_item_matrix[user_idx]
         
-        # Add rated movies to exclude
-        rated_indices = np.where(user_ratings > 0)[0]
-        rated_movie_ids = {self.idx_to_movie[idx] for idx in rated_indices}
-        exclude = exclude.union(rated_movie_ids)
+        # Rated and excluded movies as one boolean mask over item indices
+        rated_indices, _ = self._user_row(user_idx)
+        excluded = np.zeros(len(self.movie_ids), dtype=bool)
+        excluded[rated_indices] = True
+        excluded[[self.movie_to_idx[m] for m in exclude if m in self.movie_to_idx]] = True
         
-        # Get similar users
-        similar_indices = np.argsort(self.user_similarity[user_idx])[::-1][:self.k]
-        similarities = self.user_similarity[user_idx, similar_indices]
+        # Get similar users from the stored neighbours
+        neighbor_indices, neighbor_similarities = self._neighbors(user_idx)
+        top = _top_k_indices(neighbor_similarities, self.k)
+        similar_indices = neighbor_indices[top]
+        similarities = neighbor_similarities[top]
         
         # Filter positive similarities
         pos_mask = similarities > 0
-        if not np.any(pos_mask):
-            return self._get_popular_items(n, exclude)
+        if not pos_mask.any():
+            rated_movie_ids = {self.idx_to_movie[idx] for idx in rated_indices}
+            return self._get_popular_items(n, exclude | rated_movie_ids)
         
         similar_indices = similar_indices[pos_mask]
         similarities = similarities[pos_mask]
         
-        # Predict ratings for unrated movies
-        predictions = []
-        for movie_idx in range(len(self.movie_ids)):
-            movie_id = self.idx_to_movie[movie_idx]
-            
-            if movie_id in exclude:
-                continue
-            
-            # Check if any similar user rated this movie
-            neighbor_ratings = self.user_item_matrix[similar_indices, movie_idx]
-            rated_mask = neighbor_ratings > 0
-            
-            if not np.any(rated_mask):
-                continue
-            
-            # Weighted prediction
-            weights = similarities[rated_mask]
-            ratings = neighbor_ratings[rated_mask]
-            neighbor_means = self.user_means[similar_indices[rated_mask]]
-            deviations = ratings - neighbor_means
-            
-            pred = self.user_means[user_idx] + np.sum(weights * deviations) / np.sum(weights)
-            pred = float(np.clip(pred, 0.5, 5.0))
-            
-            predictions.append((movie_id, pred))
+        # Score every movie at once: similarity-weighted sums of the
+        # neighbours' mean-centered ratings over the weights of those who rated it
+        neighbor_ratings = self.user_item_csr[similar_indices].astype(np.float32)
+        rated = neighbor_ratings.copy()
+        rated.data[:] = 1.0
+        neighbor_ratings.data -= np.repeat(self.user_means[similar_indices],
+                                           np.diff(neighbor_ratings.indptr))
+        numerator = neighbor_ratings.T @ similarities
+        denominator = rated.T @ similarities
+        
+        candidate_mask = (denominator > 0) & ~excluded
+        scores = np.full(len(self.movie_ids), -np.inf)
+        scores[candidate_mask] = np.clip(
+            self.user_means[user_idx] + numerator[candidate_mask] / denominator[candidate_mask],
+            0.5, 5.0
+        )
         
-        # Sort by predicted rating
-        predictions.sort(key=lambda x: x[1], reverse=True)
+        # Partial sort for the top-n
+        top_indices = _top_k_indices(scores, n)
+        top_indices = top_indices[candidate_mask[top_indices]]
         
-        # Return top-n
         results = []
-        for movie_id, score in predictions[:n]:
-            movie_info = self._get_movie_info(movie_id)
-            movie_info['score'] = float(score)
+        for movie_idx in top_indices:
+            movie_info = self._get_movie_info(self.idx_to_movie[movie_idx])
+            movie_info['score'] = float(scores[movie_idx])
             movie_info['method'] = 'user_based'
             results.append(movie_info)
         
         return results
     
+    def _user_row(self, user_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (item indices, ratings) of a user's stored ratings."""
+        start, end = self.user_item_csr.indptr[user_idx:user_idx + 2]
+        return (self.user_item_csr.indices[start:end],
+                self.user_item_csr.data[start:end])
+    
+    def _build_movie_lookup(self, movies_df: Optional['pd.DataFrame']) -> None:
+        """Index movie details by ID and precompute the popularity order."""
+        self._movie_info = {}
+        self._popular_ids = []
+        if movies_df is None:
+            return
+        
+        movies = movies_df.drop_duplicates('movieId')
+        movie_ids = movies['movieId'].tolist()
+        titles = (movies['title'].tolist() if 'title' in movies.columns
+                  else [f'Movie {m}' for m in movie_ids])
+        genres = (movies['genres'].tolist() if 'genres' in movies.columns
+                  else [[] for _ in movie_ids])
+        avg_ratings = (movies['avgRating'].astype(float).tolist() if 'avgRating' in movies.columns
+                       else [0.0] * len(movie_ids))
+        self._movie_info = dict(zip(movie_ids, zip(titles, genres, avg_ratings)))
+        
+        sorted_df = movies_df.sort_values(by='avgRating', ascending=False)
+        self._popular_ids = [m for m in sorted_df['movieId'].tolist() if m in self.movie_to_idx]
+    
     def _get_movie_info(self, movie_id: int) -> Dict:
         """Get movie information."""
-        info = {
+        if movie_id not in self._movie_info:
+            return {
+                'movieId': int(movie_id),
+                'title': f'Movie {movie_id}',
+                'genres': [],
+                'avgRating': 0.0
+            }
+        
+        title, genres, avg_rating = self._movie_info[movie_id]
+        return {
             'movieId': int(movie_id),
-            'title': f'Movie {movie_id}',
-            'genres': [],
-            'avgRating': 0.0
+            'title': title,
+            'genres': genres,
+            'avgRating': avg_rating
         }
-        
-        if self.movies_df is not None:
-            movie_row = self.movies_df[self.movies_df['movieId'] == movie_id]
-            if not movie_row.empty:
-                row = movie_row.iloc[0]
-                info['title'] = row.get('title', info['title'])
-                info['genres'] = row.get('genres', [])
-                info['avgRating'] = float(row.get('avgRating', 0))
-        
-        return info
     
     def _get_popular_items(self, n: int, exclude: Set[int]) -> List[Dict]:
         """Get popular items for cold start."""
-        if self.movies_df is not None:
-            sorted_df = self.movies_df.sort_values(
-                by='avgRating', ascending=False
-            )
+        results = []
+        for movie_id in self._popular_ids:
+            if movie_id in exclude:
+                continue
             
-            results = []
-            for _, row in sorted_df.iterrows():
-                if row['movieId'] in exclude:
-                    continue
-                if row['movieId'] not in self.movie_to_idx:
-                    continue
-                
-                results.append({
-                    'movieId': int(row['movieId']),
-                    'title': row['title'],
-                    'genres': row.get('genres', []),
-                    'avgRating': float(row.get('avgRating', 0)),
-                    'score': float(row.get('avgRating', 0)),
-                    'method': 'popular'
-                })
-                
-                if len(results) >= n:
-                    break
+            movie_info = self._get_movie_info(movie_id)
+            movie_info['score'] = movie_info['avgRating']
+            movie_info['method'] = 'popular'
+            results.append(movie_info)
             
-            return results
+            if len(results) >= n:
+                break
+        
+        return results
+    
+    _SPARSE_FILES = {
+        'user_item_csr': sparse.csr_matrix,
+        'user_item_csc': sparse.csc_matrix,
+        'user_similarity': sparse.csr_matrix,
+    }
+    
+    def save(self, path: str) -> None:
+        """
+        Persist the fitted model to a directory.
+        
+        Rating and neighbour matrices and the per-user means go to .npy
+        files; hyperparameters and movie details are pickled.
+        
+        Args:
+            path: Directory to write the model files to
+        """
+        import os
+        import pickle
+        
+        if not self.is_fitted:
+            raise RuntimeError("Model not fitted. Call fit() first.")
+        
+        os.makedirs(path, exist_ok=True)
+        for name in self._SPARSE_FILES:
+            _save_sparse(path, name, getattr(self, name))
+        np.save(os.path.join(path, 'user_means.npy'), self.user_means)
+        
+        meta = {
+            'params': {'k': self.k, 'min_common': self.min_common,
+                       'max_neighbors': self.max_neighbors},
+            'shapes': {name: getattr(self, name).shape for name in self._SPARSE_FILES},
+            'user_ids': self.user_ids,
+            'movie_ids': self.movie_ids,
+            'movie_info': self._movie_info,
+            'popular_ids': self._popular_ids,
+        }
+        with open(os.path.join(path, 'meta.pkl'), 'wb') as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> 'UserBasedModel':
+        """
+        Load a model written by save().
+        
+        Arrays are memory-mapped read-only by default, so loading does not
+        copy them and worker processes share their pages.
         
-        return []
+        Args:
+            path: Directory the model was saved to
+            mmap_mode: numpy mmap mode for the arrays (None reads them into memory)
+            
+        Returns:
+            Fitted UserBasedModel
+        """
+        import os
+        import pickle
+        
+        with open(os.path.join(path, 'meta.pkl'), 'rb') as f:
+            meta = pickle.load(f)
+        
+        model = cls(**meta['params'])
+        for name, matrix_class in cls._SPARSE_FILES.items():
+            setattr(model, name, _load_sparse(path, name, meta['shapes'][name],
+                                              matrix_class, mmap_mode))
+        model.user_means = np.load(os.path.join(path, 'user_means.npy'), mmap_mode=mmap_mode)
+        
+        model.user_ids = meta['user_ids']
+        model.movie_ids = meta['movie_ids']
+        model.user_to_idx = dict(zip(model.user_ids, range(len(model.user_ids))))
+        model.idx_to_user = dict(enumerate(model.user_ids))
+        model.movie_to_idx = dict(zip(model.movie_ids, range(len(model.movie_ids))))
+        model.idx_to_movie = dict(enumerate(model.movie_ids))
+        model._movie_info = meta['movie_info']
+        model._popular_ids = meta['popular_ids']
+        model.is_fitted = True
+        return model
@@ -2,204 +2,238 @@
 API routes for analytics and data visualization.
 """
 from flask import Blueprint, request, jsonify
-from app.database.connection import MongoDB, Collections
+from pymongo.errors import OperationFailure
+from app.database.connection import MongoDB, Collections, CATALOG_READ_PREFERENCE
+from app.utils.helpers import ttl_cache
 from typing import Dict, List
 
 analytics_bp = Blueprint('analytics', __name__)
 
+# Caps on client-supplied sizes
+MAX_RESULTS = 50
+
+# Aggregates change slowly, so repeated dashboard polls are served from memory
+ANALYTICS_CACHE_TTL = 60
+
 
 @analytics_bp.route('/analytics/stats', methods=['GET'])
 def get_stats():
     """Get overall statistics."""
     try:
-        movies_col = MongoDB.get_collection(Collections.MOVIES)
-        users_col = MongoDB.get_collection(Collections.USERS)
-        ratings_col = MongoDB.get_collection(Collections.RATINGS)
-        
-        if movies_col is None:
+        if MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE) is None:
             return jsonify(_get_mock_stats())
         
-        # Count totals
-        total_movies = movies_col.count_documents({})
-        total_users = users_col.count_documents({}) if users_col is not None else 0
-        total_ratings = ratings_col.count_documents({}) if ratings_col is not None else 0
-        
-        # Calculate average rating
-        avg_rating = 3.5
-        if ratings_col is not None:
-            pipeline = [{'$group': {'_id': None, 'avgRating': {'$avg': '$rating'}}}]
-            result = list(ratings_col.aggregate(pipeline))
-            if result:
-                avg_rating = round(result[0]['avgRating'], 2)
-        
-        return jsonify({
-            'totalMovies': total_movies,
-            'totalUsers': total_users,
-            'totalRatings': total_ratings,
-            'avgRating': avg_rating
-        })
+        return jsonify(_compute_stats())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@ttl_cache(ttl=ANALYTICS_CACHE_TTL)
+def _compute_stats() -> Dict:
+    movies_col = MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE)
+    users_col = MongoDB.get_collection(Collections.USERS, CATALOG_READ_PREFERENCE)
+    ratings_col = MongoDB.get_collection(Collections.RATINGS, CATALOG_READ_PREFERENCE)
+    
+    # Count totals from collection metadata instead of scanning
+    total_movies = movies_col.estimated_document_count()
+    total_users = users_col.estimated_document_count() if users_col is not None else 0
+    total_ratings = ratings_col.estimated_document_count() if ratings_col is not None else 0
+    
+    # Calculate average rating, covered by the rating index when it exists
+    avg_rating = 3.5
+    if ratings_col is not None:
+        pipeline = [
+            {'$project': {'_id': 0, 'rating': 1}},
+            {'$group': {'_id': None, 'avgRating': {'$avg': '$rating'}}}
+        ]
+        try:
+            result = list(ratings_col.aggregate(pipeline, hint=[('rating', 1)]))
+        except OperationFailure:
+            result = list(ratings_col.aggregate(pipeline))
+        if result:
+            avg_rating = round(result[0]['avgRating'], 2)
+    
+    return {
+        'totalMovies': total_movies,
+        'totalUsers': total_users,
+        'totalRatings': total_ratings,
+        'avgRating': avg_rating
+    }
+
+
 @analytics_bp.route('/analytics/rating-distribution', methods=['GET'])
 def get_rating_distribution():
     """Get rating distribution histogram data."""
     try:
-        collection = MongoDB.get_collection(Collections.RATINGS)
-        
-        if collection is None:
+        if MongoDB.get_collection(Collections.RATINGS, CATALOG_READ_PREFERENCE) is None:
             return jsonify({'distribution': _get_mock_rating_distribution()})
         
-        # Aggregate rating counts
-        pipeline = [
-            {'$group': {'_id': '$rating', 'count': {'$sum': 1}}},
-            {'$sort': {'_id': 1}}
-        ]
-        
-        result = list(collection.aggregate(pipeline))
-        distribution = [{'rating': doc['_id'], 'count': doc['count']} for doc in result]
-        
-        return jsonify({'distribution': distribution})
+        return jsonify({'distribution': _compute_rating_distribution()})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@ttl_cache(ttl=ANALYTICS_CACHE_TTL)
+def _compute_rating_distribution() -> List[Dict]:
+    collection = MongoDB.get_collection(Collections.RATINGS, CATALOG_READ_PREFERENCE)
+    
+    # Aggregate rating counts
+    pipeline = [
+        {'$group': {'_id': '$rating', 'count': {'$sum': 1}}},
+        {'$sort': {'_id': 1}}
+    ]
+    
+    result = list(collection.aggregate(pipeline))
+    return [{'rating': doc['_id'], 'count': doc['count']} for doc in result]
+
+
 @analytics_bp.route('/analytics/top-movies', methods=['GET'])
 def get_top_movies():
     """Get top rated movies for analytics."""
     try:
-        limit = min(int(request.args.get('limit', 10)), 50)
-        min_ratings = int(request.args.get('min_ratings', 50))
-        
-        collection = MongoDB.get_collection(Collections.MOVIES)
+        limit = min(request.args.get('limit', 10, type=int) or 10, MAX_RESULTS)
+        min_ratings = request.args.get('min_ratings', 50, type=int)
         
-        if collection is None:
+        if MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE) is None:
             return jsonify({'movies': _get_mock_top_movies(limit)})
         
-        cursor = collection.find(
-            {'ratingCount': {'$gte': min_ratings}}
-        ).sort([('avgRating', -1), ('ratingCount', -1)]).limit(limit)
-        
-        movies = []
-        for doc in cursor:
-            movies.append({
-                'movieId': doc.get('movieId'),
-                'title': doc.get('title', ''),
-                'avgRating': float(doc.get('avgRating', 0)),
-                'ratingCount': int(doc.get('ratingCount', 0))
-            })
-        
-        return jsonify({'movies': movies})
+        return jsonify({'movies': _compute_top_movies(limit, min_ratings)})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@ttl_cache(ttl=ANALYTICS_CACHE_TTL)
+def _compute_top_movies(limit: int, min_ratings: int) -> List[Dict]:
+    collection = MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE)
+    
+    cursor = collection.find(
+        {'ratingCount': {'$gte': min_ratings}},
+        {'_id': 0, 'movieId': 1, 'title': 1, 'avgRating': 1, 'ratingCount': 1}
+    ).sort([('avgRating', -1), ('ratingCount', -1)]).limit(limit).batch_size(limit)
+    
+    return [{
+        'movieId': doc.get('movieId'),
+        'title': doc.get('title', ''),
+        'avgRating': float(doc.get('avgRating', 0)),
+        'ratingCount': int(doc.get('ratingCount', 0))
+    } for doc in cursor]
+
+
 @analytics_bp.route('/analytics/genre-frequency', methods=['GET'])
 def get_genre_frequency():
     """Get genre frequency for bar chart."""
     try:
-        collection = MongoDB.get_collection(Collections.MOVIES)
-        
-        if collection is None:
+        if MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE) is None:
             return jsonify({'genres': _get_mock_genre_frequency()})
         
-        # Unwind genres and count
-        pipeline = [
-            {'$unwind': '$genres'},
-            {'$group': {'_id': '$genres', 'count': {'$sum': 1}}},
-            {'$sort': {'count': -1}},
-            {'$limit': 15}
-        ]
-        
-        result = list(collection.aggregate(pipeline))
-        genres = [{'genre': doc['_id'], 'count': doc['count']} for doc in result]
-        
-        return jsonify({'genres': genres})
+        return jsonify({'genres': _compute_genre_frequency()})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@ttl_cache(ttl=ANALYTICS_CACHE_TTL)
+def _compute_genre_frequency() -> List[Dict]:
+    collection = MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE)
+    
+    # Unwind genres and count
+    pipeline = [
+        {'$unwind': '$genres'},
+        {'$group': {'_id': '$genres', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1}},
+        {'$limit': 15}
+    ]
+    
+    result = list(collection.aggregate(pipeline))
+    return [{'genre': doc['_id'], 'count': doc['count']} for doc in result]
+
+
 @analytics_bp.route('/analytics/heatmap', methods=['GET'])
 def get_rating_heatmap():
     """Get sample rating heatmap data (user x movie matrix)."""
     try:
-        n_users = min(int(request.args.get('n_users', 20)), 50)
-        n_movies = min(int(request.args.get('n_movies', 20)), 50)
-        
-        collection = MongoDB.get_collection(Collections.RATINGS)
+        n_users = min(request.args.get('n_users', 20, type=int) or 20, MAX_RESULTS)
+        n_movies = min(request.args.get('n_movies', 20, type=int) or 20, MAX_RESULTS)
         
-        if collection is None:
+        if MongoDB.get_collection(Collections.RATINGS, CATALOG_READ_PREFERENCE) is None:
             return jsonify(_get_mock_heatmap_data(n_users, n_movies))
         
-        # Get sample of most active users
-        user_pipeline = [
+        return jsonify(_compute_rating_heatmap(n_users, n_movies))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@ttl_cache(ttl=ANALYTICS_CACHE_TTL)
+def _compute_rating_heatmap(n_users: int, n_movies: int) -> Dict:
+    collection = MongoDB.get_collection(Collections.RATINGS, CATALOG_READ_PREFERENCE)
+    
+    # Most active users and most rated movies from one $facet pass
+    facet_pipeline = [{'$facet': {
+        'topUsers': [
             {'$group': {'_id': '$userId', 'count': {'$sum': 1}}},
             {'$sort': {'count': -1}},
             {'$limit': n_users}
-        ]
-        top_users = [doc['_id'] for doc in collection.aggregate(user_pipeline)]
-        
-        # Get most rated movies
-        movie_pipeline = [
+        ],
+        'topMovies': [
             {'$group': {'_id': '$movieId', 'count': {'$sum': 1}}},
             {'$sort': {'count': -1}},
             {'$limit': n_movies}
         ]
-        top_movies = [doc['_id'] for doc in collection.aggregate(movie_pipeline)]
-        
-        # Get ratings for these users/movies
-        ratings = collection.find({
-            'userId': {'$in': top_users},
-            'movieId': {'$in': top_movies}
-        })
-        
-        # Build matrix
-        matrix = {}
-        for rating in ratings:
-            user_id = rating['userId']
-            movie_id = rating['movieId']
-            if user_id not in matrix:
-                matrix[user_id] = {}
-            matrix[user_id][movie_id] = rating['rating']
-        
-        return jsonify({
-            'userIds': top_users,
-            'movieIds': top_movies,
-            'matrix': matrix
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    }}]
+    facets = next(collection.aggregate(facet_pipeline, allowDiskUse=True), {})
+    top_users = [doc['_id'] for doc in facets.get('topUsers', [])]
+    top_movies = [doc['_id'] for doc in facets.get('topMovies', [])]
+    
+    # Get ratings for these users/movies
+    ratings = collection.find({
+        'userId': {'$in': top_users},
+        'movieId': {'$in': top_movies}
+    }, {'userId': 1, 'movieId': 1, 'rating': 1, '_id': 0})
+    
+    # Build a users x movies matrix in one pass (None where unrated)
+    user_pos = {uid: i for i, uid in enumerate(top_users)}
+    movie_pos = {mid: j for j, mid in enumerate(top_movies)}
+    matrix = [[None] * len(top_movies) for _ in top_users]
+    for rating in ratings:
+        matrix[user_pos[rating['userId']]][movie_pos[rating['movieId']]] = rating['rating']
+    
+    return {
+        'userIds': top_users,
+        'movieIds': top_movies,
+        'matrix': matrix
+    }
 
 
 @analytics_bp.route('/analytics/user-activity', methods=['GET'])
 def get_user_activity():
     """Get user activity distribution."""
     try:
-        collection = MongoDB.get_collection(Collections.RATINGS)
-        
-        if collection is None:
+        if MongoDB.get_collection(Collections.RATINGS, CATALOG_READ_PREFERENCE) is None:
             return jsonify({'distribution': _get_mock_user_activity()})
         
-        # Count ratings per user and group by ranges
-        pipeline = [
-            {'$group': {'_id': '$userId', 'ratingCount': {'$sum': 1}}},
-            {'$bucket': {
-                'groupBy': '$ratingCount',
-                'boundaries': [0, 10, 50, 100, 500, 1000, 10000],
-                'default': '10000+',
-                'output': {'count': {'$sum': 1}}
-            }}
-        ]
-        
-        result = list(collection.aggregate(pipeline))
-        distribution = [{'range': str(doc['_id']), 'count': doc['count']} for doc in result]
-        
-        return jsonify({'distribution': distribution})
+        return jsonify({'distribution': _compute_user_activity()})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@ttl_cache(ttl=ANALYTICS_CACHE_TTL)
+def _compute_user_activity() -> List[Dict]:
+    collection = MongoDB.get_collection(Collections.RATINGS, CATALOG_READ_PREFERENCE)
+    
+    # Count ratings per user and group by ranges
+    pipeline = [
+        {'$group': {'_id': '$userId', 'ratingCount': {'$sum': 1}}},
+        {'$bucket': {
+            'groupBy': '$ratingCount',
+            'boundaries': [0, 10, 50, 100, 500, 1000, 10000],
+            'default': '10000+',
+            'output': {'count': {'$sum': 1}}
+        }}
+    ]
+    
+    result = list(collection.aggregate(pipeline))
+    return [{'range': str(doc['_id']), 'count': doc['count']} for doc in result]
+
+
 # Mock data functions
 def _get_mock_stats() -> Dict:
     return {
@@ -261,11 +295,10 @@ def _get_mock_heatmap_data(n_users: int, n_movies: int) -> Dict:
     user_ids = list(range(1, n_users + 1))
     movie_ids = list(range(1, n_movies + 1))
     
-    matrix = {}
-    for uid in user_ids:
-        matrix[uid] = {}
-        for mid in random.sample(movie_ids, random.randint(3, min(10, n_movies))):
-            matrix[uid][mid] = round(random.uniform(1, 5) * 2) / 2  # 0.5 increments
+    matrix = [[None] * n_movies for _ in user_ids]
+    for row in matrix:
+        for j in random.sample(range(n_movies), random.randint(3, min(10, n_movies))):
+            row[j] = round(random.uniform(1, 5) * 2) / 2  # 0.5 increments
     
     return {'userIds': user_ids, 'movieIds': movie_ids, 'matrix': matrix}
 
@@ -1,21 +1,65 @@
 """
 API routes for movie management.
 """
-from flask import Blueprint, request, jsonify
-from app.database.connection import MongoDB, Collections
-from typing import List, Dict, Any
+import json
+import base64
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from bson import json_util
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from app.database.connection import (
+    MongoDB, Collections, MOVIE_FIELDS, MOVIE_PROJECTION, CATALOG_READ_PREFERENCE
+)
+from app.utils.helpers import ttl_cache, cached_response
+from typing import List, Dict, Any, Optional, Tuple
 
 
 movies_bp = Blueprint('movies', __name__)
 
+# Caps on client-supplied sizes
+MAX_PAGE_SIZE = 100
+MAX_RESULTS = 50
+
+# Top movies at the default rating threshold, materialized into their
+# own small collection and rebuilt every few minutes by a background
+# thread (one rebuild per interval across all workers)
+TOP_VIEW_MIN_RATINGS = 100
+TOP_VIEW_SIZE = 500
+TOP_VIEW_REFRESH_SECONDS = 300
+
+# Genre list (meta document and HTTP cache) lifetime
+GENRES_TTL_SECONDS = 300
+
+# Indexes (see database/schemas.py) pinned for listing sorts, unfiltered
+# and filtered by genre, so the planner walks them instead of sorting in memory
+_SORT_INDEXES = {
+    'avgRating': 'avgRating_-1__id_-1',
+    'ratingCount': 'ratingCount_-1__id_-1',
+    'title': 'title_1__id_1',
+}
+_GENRE_SORT_INDEXES = {
+    'avgRating': 'genres_1_avgRating_-1__id_-1',
+    'ratingCount': 'genres_1_ratingCount_-1__id_-1',
+    'title': 'genres_1_title_1__id_1',
+}
+
+# Minimum textScore for a search hit (title terms weigh 10, genres 5)
+SEARCH_MIN_SCORE = 1.0
+
 
 @movies_bp.route('/movies', methods=['GET'])
+@cached_response(ttl=10)
 def get_movies():
     """
     Get list of movies with pagination and filtering.
     
     Query params:
-        page: Page number (default 1)
+        after: Cursor from a previous response's nextCursor (seeks instead
+               of skipping; preferred over page)
+        page: Page number (default 1, deprecated in favour of after)
         limit: Items per page (default 20)
         genre: Filter by genre
         sort: Sort field (avgRating, ratingCount, title)
@@ -24,8 +68,9 @@ def get_movies():
     """
     try:
         # Get query parameters
-        page = int(request.args.get('page', 1))
-        limit = min(int(request.args.get('limit', 20)), 100)
+        page = max(1, request.args.get('page', 1, type=int))
+        limit = min(request.args.get('limit', 20, type=int) or 20, MAX_PAGE_SIZE)
+        after = request.args.get('after')
         genre = request.args.get('genre')
         sort_field = request.args.get('sort', 'avgRating')
         sort_order = request.args.get('order', 'desc')
@@ -41,33 +86,41 @@ def get_movies():
             query['$text'] = {'$search': search}
         
         # Get collection
-        collection = MongoDB.get_collection(Collections.MOVIES)
+        collection = MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE)
         
         if collection is None:
             # Return mock data if no database
-            return jsonify(_get_mock_movies(page, limit))
+            mock = _get_mock_movies(page, limit)
+            if _wants_ndjson():
+                movies = mock.pop('movies')
+                return _ndjson_response(movies, mock)
+            return jsonify(mock)
         
         # Sort direction
         sort_dir = -1 if sort_order == 'desc' else 1
         
-        # Execute query
-        skip = (page - 1) * limit
-        cursor = collection.find(query).sort(sort_field, sort_dir).skip(skip).limit(limit)
-        
-        movies = []
-        for doc in cursor:
-            movies.append(_serialize_movie(doc))
-        
-        # Get total count
-        total = collection.count_documents(query)
-        
-        return jsonify({
-            'movies': movies,
+        # Execute query: seek past the cursor, or skip for page numbers
+        seek, skip = None, (page - 1) * limit
+        if after:
+            try:
+                seek = _seek_filter(after, sort_field, sort_dir)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            skip = 0
+        docs, total = _fetch_movie_page(
+            collection, query, seek, [(sort_field, sort_dir), ('_id', sort_dir)], skip, limit
+        )
+        meta = {
             'page': page,
             'limit': limit,
             'total': total,
-            'pages': (total + limit - 1) // limit
-        })
+            'pages': (total + limit - 1) // limit,
+            'nextCursor': _encode_cursor(docs[-1], sort_field) if len(docs) == limit else None
+        }
+        if _wants_ndjson():
+            return _ndjson_response(docs, meta)
+        
+        return jsonify({'movies': [_serialize_movie(doc) for doc in docs], **meta})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -76,7 +129,7 @@ def get_movies():
 def get_movie(movie_id: int):
     """Get a single movie by ID."""
     try:
-        collection = MongoDB.get_collection(Collections.MOVIES)
+        collection = MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE)
         
         if collection is None:
             # Return mock data
@@ -85,7 +138,7 @@ def get_movie(movie_id: int):
                 return jsonify(mock)
             return jsonify({'error': 'Movie not found'}), 404
         
-        movie = collection.find_one({'movieId': movie_id})
+        movie = collection.find_one({'movieId': movie_id}, MOVIE_PROJECTION)
         
         if movie is None:
             return jsonify({'error': 'Movie not found'}), 404
@@ -97,51 +150,70 @@ def get_movie(movie_id: int):
 
 @movies_bp.route('/movies/genre/<genre>', methods=['GET'])
 def get_movies_by_genre(genre: str):
-    """Get movies by genre."""
+    """Get movies by genre (paged by the after cursor, or page as a fallback)."""
     try:
-        page = int(request.args.get('page', 1))
-        limit = min(int(request.args.get('limit', 20)), 100)
+        page = max(1, request.args.get('page', 1, type=int))
+        limit = min(request.args.get('limit', 20, type=int) or 20, MAX_PAGE_SIZE)
+        after = request.args.get('after')
         
-        collection = MongoDB.get_collection(Collections.MOVIES)
+        collection = MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE)
         
         if collection is None:
             return jsonify(_get_mock_movies_by_genre(genre, page, limit))
         
-        skip = (page - 1) * limit
+        seek, skip = None, (page - 1) * limit
+        if after:
+            try:
+                seek = _seek_filter(after, 'avgRating', -1)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            skip = 0
         
-        cursor = collection.find({'genres': genre}).sort('avgRating', -1).skip(skip).limit(limit)
-        movies = [_serialize_movie(doc) for doc in cursor]
-        
-        total = collection.count_documents({'genres': genre})
+        docs, total = _fetch_movie_page(
+            collection, {'genres': genre}, seek, [('avgRating', -1), ('_id', -1)], skip, limit
+        )
+        movies = [_serialize_movie(doc) for doc in docs]
         
         return jsonify({
             'movies': movies,
             'genre': genre,
             'page': page,
             'limit': limit,
-            'total': total
+            'total': total,
+            'nextCursor': _encode_cursor(docs[-1], 'avgRating') if len(docs) == limit else None
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @movies_bp.route('/movies/top', methods=['GET'])
+@cached_response(ttl=60)
 def get_top_movies():
     """Get top rated movies."""
     try:
-        limit = min(int(request.args.get('limit', 10)), 50)
-        min_ratings = int(request.args.get('min_ratings', 100))
+        limit = min(request.args.get('limit', 10, type=int) or 10, MAX_RESULTS)
+        min_ratings = request.args.get('min_ratings', TOP_VIEW_MIN_RATINGS, type=int)
         
-        collection = MongoDB.get_collection(Collections.MOVIES)
+        collection = MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE)
         
         if collection is None:
             return jsonify({'movies': _get_mock_top_movies(limit)})
         
-        cursor = collection.find(
-            {'ratingCount': {'$gte': min_ratings}}
-        ).sort('avgRating', -1).limit(limit)
-        
-        movies = [_serialize_movie(doc) for doc in cursor]
+        # The default threshold is served from the precomputed view; until
+        # its first build lands the movies collection is queried directly
+        movies = []
+        if min_ratings == TOP_VIEW_MIN_RATINGS:
+            _start_top_movies_refresher()
+            view = MongoDB.get_collection(Collections.TOP_MOVIES, CATALOG_READ_PREFERENCE)
+            cursor = view.find({}, MOVIE_PROJECTION).sort('avgRating', -1).limit(limit).batch_size(limit)
+            movies = [_serialize_movie(doc) for doc in cursor]
+        
+        if not movies:
+            cursor = collection.find(
+                {'ratingCount': {'$gte': min_ratings}},
+                MOVIE_PROJECTION
+            ).sort('avgRating', -1).limit(limit).batch_size(limit)
+            movies = [_serialize_movie(doc) for doc in cursor]
         
         return jsonify({'movies': movies})
     except Exception as e:
@@ -153,25 +225,34 @@ def search_movies():
     """Search movies by title."""
     try:
         query = request.args.get('q', '')
-        limit = min(int(request.args.get('limit', 20)), 50)
+        limit = min(request.args.get('limit', 20, type=int) or 20, MAX_RESULTS)
         
         if not query:
             return jsonify({'movies': [], 'query': query})
         
-        collection = MongoDB.get_collection(Collections.MOVIES)
+        collection = MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE)
         
         if collection is None:
             # Mock search
+            if _wants_ndjson():
+                return _ndjson_response(_mock_search_movies(query, limit), {'query': query})
             return jsonify({
                 'movies': _mock_search_movies(query, limit),
                 'query': query
             })
         
-        # Text search
-        cursor = collection.find(
-            {'$text': {'$search': query}},
-            {'score': {'$meta': 'textScore'}}
-        ).sort([('score', {'$meta': 'textScore'})]).limit(limit)
+        # Text search over the weighted title/genres index, dropping weak matches
+        pipeline = [
+            {'$match': {'$text': {'$search': query}}},
+            {'$addFields': {'score': {'$meta': 'textScore'}}},
+            {'$match': {'score': {'$gte': SEARCH_MIN_SCORE}}},
+            {'$sort': {'score': -1}},
+            {'$limit': limit},
+            {'$project': MOVIE_PROJECTION}
+        ]
+        cursor = collection.aggregate(pipeline, batchSize=limit)
+        if _wants_ndjson():
+            return _ndjson_response(cursor, {'query': query})
         
         movies = [_serialize_movie(doc) for doc in cursor]
         
@@ -181,86 +262,267 @@ def search_movies():
 
 
 @movies_bp.route('/genres', methods=['GET'])
+@cached_response(ttl=GENRES_TTL_SECONDS)
 def get_genres():
     """Get all available genres."""
     try:
-        collection = MongoDB.get_collection(Collections.MOVIES)
+        collection = MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE)
         
         if collection is None:
             return jsonify({'genres': _get_all_genres()})
         
-        # Aggregate distinct genres
-        genres = collection.distinct('genres')
-        
-        # Filter out None values and sort
-        genres = [g for g in genres if g is not None and isinstance(g, str)]
-        
-        return jsonify({'genres': sorted(genres)})
+        # Written at import; recomputed from the movies when missing or
+        # older than the TTL, so catalog edits show up
+        meta_col = MongoDB.get_collection(Collections.META, CATALOG_READ_PREFERENCE)
+        doc = meta_col.find_one({'_id': 'genres'})
+        fresh_after = datetime.utcnow() - timedelta(seconds=GENRES_TTL_SECONDS)
+        if doc is not None and doc.get('updatedAt') and doc['updatedAt'] > fresh_after:
+            return jsonify({'genres': doc['list']})
+        
+        genres = sorted(g for g in collection.distinct('genres') if isinstance(g, str))
+        meta_col.update_one(
+            {'_id': 'genres'},
+            {'$set': {'list': genres, 'updatedAt': datetime.utcnow()}},
+            upsert=True
+        )
+        
+        return jsonify({'genres': genres})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-def _serialize_movie(doc: Dict) -> Dict:
-    """Serialize MongoDB document to JSON-safe dict."""
-    year = doc.get('year')
-    # Ensure year is a valid number or None
-    if year is not None:
+def _fetch_movie_page(collection, query: Dict, seek: Optional[Dict],
+                      sort: List[Tuple[str, int]], skip: int, limit: int) -> Tuple[List[Dict], int]:
+    """
+    Fetch one page of movies and the total number matching the query.
+    
+    The page always comes from an index-backed find().sort().limit(),
+    so only one page of documents is read. The unfiltered total comes
+    from collection metadata, and filtered totals are counted separately
+    and cached briefly per query.
+    
+    Args:
+        collection: Movies collection
+        query: Filter defining the listing (and its total)
+        seek: Extra range filter selecting the page after a cursor, or None
+        sort: Sort specification as (field, direction) pairs
+        skip: Documents to skip (0 when seeking)
+        limit: Page size
+        
+    Returns:
+        Tuple of (movie documents, total matching movies)
+    """
+    hint = _index_hint(query, sort[0][0])
+    if query:
+        total = _cached_movie_count(json.dumps(query, sort_keys=True))
+    else:
+        total = collection.estimated_document_count()
+    
+    page_query = {**query, **seek} if seek else query
+    cursor = collection.find(page_query, MOVIE_PROJECTION).sort(sort).skip(skip)
+    try:
+        docs = list(cursor.clone().hint(hint).limit(limit).batch_size(limit))
+    except OperationFailure:
+        if not hint:
+            raise
+        docs = list(cursor.limit(limit).batch_size(limit))
+    return docs, total
+
+
+def _index_hint(query: Dict, sort_field: str) -> Optional[str]:
+    """Name of the compound index serving a listing's filter and sort, if any."""
+    if not query:
+        return _SORT_INDEXES.get(sort_field)
+    if query.keys() == {'genres'}:
+        return _GENRE_SORT_INDEXES.get(sort_field)
+    return None
+
+
+_top_view_refresher: Optional[threading.Thread] = None
+_top_view_refresher_lock = threading.Lock()
+
+
+def _start_top_movies_refresher() -> None:
+    """Start this process's top-movies refresh thread if it is not running."""
+    global _top_view_refresher
+    if _top_view_refresher is not None:
+        return
+    with _top_view_refresher_lock:
+        if _top_view_refresher is None:
+            _top_view_refresher = threading.Thread(
+                target=_refresh_top_movies_loop, name='top-movies-view', daemon=True
+            )
+            _top_view_refresher.start()
+
+
+def _refresh_top_movies_loop() -> None:
+    while True:
         try:
-            year = int(year)
-        except (ValueError, TypeError):
-            year = None
+            refresh_top_movies_view()
+        except Exception as e:
+            print(f"✗ Failed to refresh top movies view: {e}")
+        time.sleep(TOP_VIEW_REFRESH_SECONDS)
+
+
+def refresh_top_movies_view(force: bool = False) -> bool:
+    """
+    Rebuild the top-movies collection unless it was rebuilt recently.
     
-    return {
-        'movieId': doc.get('movieId'),
-        'title': doc.get('title', ''),
-        'genres': doc.get('genres', []),
-        'year': year,
-        'avgRating': float(doc.get('avgRating', 0) or 0),
-        'ratingCount': int(doc.get('ratingCount', 0) or 0)
-    }
+    A lease document in the meta collection lets only one process claim
+    each refresh interval. $out swaps the new collection in atomically, so
+    readers keep getting the previous view while it rebuilds.
+    
+    Args:
+        force: Rebuild even if the interval has not passed (admin use)
+        
+    Returns:
+        True if this call rebuilt the view
+    """
+    meta_col = MongoDB.get_collection(Collections.META)
+    movies_col = MongoDB.get_collection(Collections.MOVIES)
+    if meta_col is None or movies_col is None:
+        return False
+    
+    now = datetime.utcnow()
+    lease = {'_id': 'top_movies_view'}
+    if not force:
+        lease['$or'] = [
+            {'refreshedAt': {'$lt': now - timedelta(seconds=TOP_VIEW_REFRESH_SECONDS)}},
+            {'refreshedAt': {'$exists': False}}
+        ]
+    try:
+        meta_col.update_one(lease, {'$set': {'refreshedAt': now}}, upsert=True)
+    except DuplicateKeyError:
+        # Another process claimed this interval
+        return False
+    
+    movies_col.aggregate([
+        {'$match': {'ratingCount': {'$gte': TOP_VIEW_MIN_RATINGS}}},
+        {'$sort': {'avgRating': -1}},
+        {'$limit': TOP_VIEW_SIZE},
+        {'$project': MOVIE_PROJECTION},
+        {'$out': Collections.TOP_MOVIES}
+    ])
+    return True
+
+
+@ttl_cache(ttl=30, maxsize=512)
+def _cached_movie_count(query_key: str) -> int:
+    collection = MongoDB.get_collection(Collections.MOVIES, CATALOG_READ_PREFERENCE)
+    return collection.count_documents(json.loads(query_key))
+
+
+def _encode_cursor(doc: Dict, sort_field: str) -> str:
+    """Encode the last document's sort value and _id as an opaque page cursor."""
+    payload = json_util.dumps([doc.get(sort_field), doc['_id']])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _seek_filter(cursor: str, sort_field: str, sort_dir: int) -> Dict:
+    """
+    Build the range filter selecting documents after a page cursor.
+    
+    Args:
+        cursor: Value returned as nextCursor by the previous page
+        sort_field: Field the listing is sorted by
+        sort_dir: 1 for ascending, -1 for descending
+        
+    Returns:
+        Filter to merge into the page query
+        
+    Raises:
+        ValueError: If the cursor cannot be decoded
+    """
+    try:
+        value, last_id = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    
+    op = '$lt' if sort_dir < 0 else '$gt'
+    return {'$or': [
+        {sort_field: {op: value}},
+        {sort_field: value, '_id': {op: last_id}}
+    ]}
+
+
+def _wants_ndjson() -> bool:
+    """Whether the client asked for a streamed NDJSON listing (?format=ndjson)."""
+    return request.args.get('format') == 'ndjson'
+
+
+def _ndjson_response(docs, meta: Dict) -> Response:
+    """
+    Stream movies as newline-delimited JSON.
+    
+    Each movie is encoded and sent as it is read, so a page is never held
+    as one serialized document. A final {"_meta": ...} line carries the
+    listing metadata.
+    
+    Args:
+        docs: Iterable of movie documents (a list or a live cursor)
+        meta: Listing metadata (paging, totals, query)
+        
+    Returns:
+        Streaming application/x-ndjson response
+    """
+    dumps = current_app.json.dumps
+    
+    def generate():
+        for doc in docs:
+            yield dumps(_serialize_movie(doc)) + '\n'
+        yield dumps({'_meta': meta}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def _serialize_movie(doc: Dict) -> Dict:
+    """Pick the API fields from a MOVIE_PROJECTION document (already coerced)."""
+    return {field: doc.get(field) for field in MOVIE_FIELDS}
+
+
+# Mock data for development without database, built once at import
+_MOCK_MOVIES = (
+    {'movieId': 1, 'title': 'The Shawshank Redemption (1994)', 'genres': ['Drama'], 'year': 1994, 'avgRating': 4.8, 'ratingCount': 12453},
+    {'movieId': 2, 'title': 'The Godfather (1972)', 'genres': ['Crime', 'Drama'], 'year': 1972, 'avgRating': 4.7, 'ratingCount': 9821},
+    {'movieId': 3, 'title': 'The Dark Knight (2008)', 'genres': ['Action', 'Crime', 'Drama'], 'year': 2008, 'avgRating': 4.6, 'ratingCount': 15234},
+    {'movieId': 4, 'title': 'Pulp Fiction (1994)', 'genres': ['Crime', 'Drama'], 'year': 1994, 'avgRating': 4.5, 'ratingCount': 8932},
+    {'movieId': 5, 'title': 'Forrest Gump (1994)', 'genres': ['Drama', 'Romance'], 'year': 1994, 'avgRating': 4.5, 'ratingCount': 11234},
+    {'movieId': 6, 'title': 'Inception (2010)', 'genres': ['Action', 'Sci-Fi', 'Thriller'], 'year': 2010, 'avgRating': 4.4, 'ratingCount': 13456},
+    {'movieId': 7, 'title': 'The Matrix (1999)', 'genres': ['Action', 'Sci-Fi'], 'year': 1999, 'avgRating': 4.4, 'ratingCount': 10234},
+    {'movieId': 8, 'title': 'Goodfellas (1990)', 'genres': ['Biography', 'Crime', 'Drama'], 'year': 1990, 'avgRating': 4.3, 'ratingCount': 7654},
+    {'movieId': 9, 'title': 'Interstellar (2014)', 'genres': ['Adventure', 'Drama', 'Sci-Fi'], 'year': 2014, 'avgRating': 4.3, 'ratingCount': 12876},
+    {'movieId': 10, 'title': 'Fight Club (1999)', 'genres': ['Drama'], 'year': 1999, 'avgRating': 4.3, 'ratingCount': 9876},
+)
+_MOCK_BY_ID = {m['movieId']: m for m in _MOCK_MOVIES}
+_MOCK_BY_GENRE = defaultdict(list)
+for _movie in _MOCK_MOVIES:
+    for _genre in _movie['genres']:
+        _MOCK_BY_GENRE[_genre].append(_movie)
+del _movie, _genre
 
 
-# Mock data functions for development without database
 def _get_mock_movies(page: int, limit: int) -> Dict:
     """Return mock movies data."""
-    mock_movies = [
-        {'movieId': 1, 'title': 'The Shawshank Redemption (1994)', 'genres': ['Drama'], 'year': 1994, 'avgRating': 4.8, 'ratingCount': 12453},
-        {'movieId': 2, 'title': 'The Godfather (1972)', 'genres': ['Crime', 'Drama'], 'year': 1972, 'avgRating': 4.7, 'ratingCount': 9821},
-        {'movieId': 3, 'title': 'The Dark Knight (2008)', 'genres': ['Action', 'Crime', 'Drama'], 'year': 2008, 'avgRating': 4.6, 'ratingCount': 15234},
-        {'movieId': 4, 'title': 'Pulp Fiction (1994)', 'genres': ['Crime', 'Drama'], 'year': 1994, 'avgRating': 4.5, 'ratingCount': 8932},
-        {'movieId': 5, 'title': 'Forrest Gump (1994)', 'genres': ['Drama', 'Romance'], 'year': 1994, 'avgRating': 4.5, 'ratingCount': 11234},
-        {'movieId': 6, 'title': 'Inception (2010)', 'genres': ['Action', 'Sci-Fi', 'Thriller'], 'year': 2010, 'avgRating': 4.4, 'ratingCount': 13456},
-        {'movieId': 7, 'title': 'The Matrix (1999)', 'genres': ['Action', 'Sci-Fi'], 'year': 1999, 'avgRating': 4.4, 'ratingCount': 10234},
-        {'movieId': 8, 'title': 'Goodfellas (1990)', 'genres': ['Biography', 'Crime', 'Drama'], 'year': 1990, 'avgRating': 4.3, 'ratingCount': 7654},
-        {'movieId': 9, 'title': 'Interstellar (2014)', 'genres': ['Adventure', 'Drama', 'Sci-Fi'], 'year': 2014, 'avgRating': 4.3, 'ratingCount': 12876},
-        {'movieId': 10, 'title': 'Fight Club (1999)', 'genres': ['Drama'], 'year': 1999, 'avgRating': 4.3, 'ratingCount': 9876},
-    ]
-    
     start = (page - 1) * limit
     end = start + limit
     
     return {
-        'movies': mock_movies[start:end],
+        'movies': _MOCK_MOVIES[start:end],
         'page': page,
         'limit': limit,
-        'total': len(mock_movies),
+        'total': len(_MOCK_MOVIES),
         'pages': 1
     }
 
 
 def _get_mock_movie(movie_id: int) -> Dict:
     """Get mock movie by ID."""
-    movies = _get_mock_movies(1, 20)['movies']
-    for movie in movies:
-        if movie['movieId'] == movie_id:
-            return movie
-    return None
+    return _MOCK_BY_ID.get(movie_id)
 
 
 def _get_mock_movies_by_genre(genre: str, page: int, limit: int) -> Dict:
     """Get mock movies filtered by genre."""
-    all_movies = _get_mock_movies(1, 100)['movies']
-    filtered = [m for m in all_movies if genre in m.get('genres', [])]
+    filtered = _MOCK_BY_GENRE.get(genre, [])
     
     start = (page - 1) * limit
     end = start + limit
@@ -276,14 +538,13 @@ def _get_mock_movies_by_genre(genre: str, page: int, limit: int) -> Dict:
 
 def _get_mock_top_movies(limit: int) -> List[Dict]:
     """Get mock top movies."""
-    return _get_mock_movies(1, limit)['movies']
+    return _MOCK_MOVIES[:limit]
 
 
 def _mock_search_movies(query: str, limit: int) -> List[Dict]:
     """Mock movie search."""
-    all_movies = _get_mock_movies(1, 100)['movies']
     query_lower = query.lower()
-    return [m for m in all_movies if query_lower in m['title'].lower()][:limit]
+    return [m for m in _MOCK_MOVIES if query_lower in m['title'].lower()][:limit]
 
 
 def _get_all_genres() -> List[str]:
@@ -2,31 +2,91 @@
 API routes for movie recommendations.
 """
 from flask import Blueprint, request, jsonify
-from app.database.connection import MongoDB, Collections
-from typing import Dict, List
-import pickle
+from app.database.connection import MongoDB, Collections, CATALOG_READ_PREFERENCE
+from app.utils.helpers import cached_response
+from typing import Dict, List, Set
+import importlib
 import os
+import threading
 
 recommendation_bp = Blueprint('recommendation', __name__)
+
+# Caps on client-supplied sizes
+MAX_RESULTS = 50
+
+MODEL_NAMES = ('content_based', 'item_based', 'user_based', 'hybrid')
 _model_cache: Dict = {}
+_model_lock = threading.Lock()
+
+# Per-model request coalescers; created lazily so they start in the
+# serving process (threads do not survive a preload fork)
+_batchers: Dict = {}
+BATCH_TIMEOUT_SECONDS = 10
+
+# Models that can be loaded from a save() directory: module and class
+_ARRAY_MODELS = {
+    'content_based': ('app.models.content_based', 'ContentBasedModel'),
+    'item_based': ('app.models.item_based', 'ItemBasedModel'),
+    'user_based': ('app.models.user_based', 'UserBasedModel'),
+}
 
 
 def _get_model(model_name: str):
     """Get or load a recommendation model."""
-    if model_name in _model_cache:
-        return _model_cache[model_name]
+    model = _model_cache.get(model_name)
+    if model is not None:
+        return model
     
+    # Only one thread unpickles a given model; the rest wait and reuse it
+    with _model_lock:
+        model = _model_cache.get(model_name)
+        if model is None:
+            model = _load_model(model_name)
+            if model is not None:
+                _model_cache[model_name] = model
+    return model
+
+
+def _load_model(model_name: str):
+    """Load a saved model from disk, or None if it has not been trained."""
     from app.config import Config
     model_path = os.path.join(Config.MODELS_DIR, f'{model_name}.pkl')
     
+    # Models saved as array directories are memory-mapped, so loading is
+    # near-instant and workers share one copy
+    array_dir = os.path.join(Config.MODELS_DIR, model_name)
+    if model_name in _ARRAY_MODELS and os.path.isdir(array_dir):
+        module_name, class_name = _ARRAY_MODELS[model_name]
+        model_class = getattr(importlib.import_module(module_name), class_name)
+        return model_class.load(array_dir)
+    
     if os.path.exists(model_path):
+        import pickle
         with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-            _model_cache[model_name] = model
-            return model
+            return pickle.load(f)
     return None
 
 
+def _get_batcher(model_name: str, model):
+    """Get the request batcher for a model, starting it on first use."""
+    from app.services.batching import RecommendationBatcher
+    
+    batcher = _batchers.get(model_name)
+    if batcher is None or batcher.model is not model:
+        with _model_lock:
+            batcher = _batchers.get(model_name)
+            if batcher is None or batcher.model is not model:
+                batcher = RecommendationBatcher(model)
+                _batchers[model_name] = batcher
+    return batcher
+
+
+def warmup_models():
+    """Load every saved model up front so no request pays for unpickling."""
+    for model_name in MODEL_NAMES:
+        _get_model(model_name)
+
+
 def _get_user_ratings(user_id: int) -> List[Dict]:
     """Get user's ratings from database."""
     collection = MongoDB.get_collection(Collections.RATINGS)
@@ -37,19 +97,33 @@ def _get_user_ratings(user_id: int) -> List[Dict]:
     return [{'movieId': doc['movieId'], 'rating': float(doc['rating'])} for doc in cursor]
 
 
+def _get_user_rated_ids(user_id: int) -> Set[int]:
+    """Get the IDs of movies a user has rated."""
+    collection = MongoDB.get_collection(Collections.RATINGS)
+    if collection is None:
+        return {r['movieId'] for r in _get_mock_user_ratings(user_id)}
+    
+    return set(collection.distinct('movieId', {'userId': user_id}))
+
+
 @recommendation_bp.route('/recommendations/<int:user_id>', methods=['GET'])
 def get_recommendations(user_id: int):
     """Get movie recommendations for a user."""
     try:
         model_name = request.args.get('model', 'hybrid')
-        n = min(int(request.args.get('n', 10)), 50)
+        n = min(request.args.get('n', 10, type=int) or 10, MAX_RESULTS)
         
-        valid_models = ['content_based', 'item_based', 'user_based', 'hybrid']
-        if model_name not in valid_models:
-            return jsonify({'error': f'Invalid model. Choose from: {valid_models}'}), 400
+        if model_name not in MODEL_NAMES:
+            return jsonify({'error': f'Invalid model. Choose from: {list(MODEL_NAMES)}'}), 400
         
-        user_ratings = _get_user_ratings(user_id)
-        exclude_ids = {r['movieId'] for r in user_ratings}
+        # Only content-based and hybrid scoring use the rating values; the
+        # collaborative models just need the rated IDs to exclude
+        if model_name in ('content_based', 'hybrid'):
+            user_ratings = _get_user_ratings(user_id)
+            exclude_ids = {r['movieId'] for r in user_ratings}
+        else:
+            user_ratings = None
+            exclude_ids = _get_user_rated_ids(user_id)
         
         model = _get_model(model_name)
         
@@ -57,7 +131,13 @@ def get_recommendations(user_id: int):
             if model_name == 'content_based':
                 recommendations = model.recommend_for_user(user_id, user_ratings, n=n, exclude=exclude_ids)
             elif model_name == 'hybrid':
-                recommendations = model.recommend(user_id, n=n, exclude=exclude_ids, user_rated_movies=user_ratings)
+                # Components run concurrently on the shared executor
+                recommendations = model.recommend(user_id, n=n, exclude=exclude_ids,
+                                                  user_rated_movies=user_ratings)
+            elif model_name == 'item_based':
+                # Concurrent requests are scored together in one batch
+                future = _get_batcher(model_name, model).submit(user_id, n, exclude_ids)
+                recommendations = future.result(timeout=BATCH_TIMEOUT_SECONDS)
             else:
                 recommendations = model.recommend(user_id, n=n, exclude=exclude_ids)
         else:
@@ -73,7 +153,7 @@ def get_similar_movies(movie_id: int):
     """Get movies similar to a given movie."""
     try:
         model_name = request.args.get('model', 'hybrid')
-        n = min(int(request.args.get('n', 10)), 50)
+        n = min(request.args.get('n', 10, type=int) or 10, MAX_RESULTS)
         
         model = _get_model(model_name)
         
@@ -95,10 +175,11 @@ def get_similar_movies(movie_id: int):
 
 
 @recommendation_bp.route('/models', methods=['GET'])
+@cached_response(ttl=60)
 def get_models():
     """Get available recommendation models and their metrics."""
     try:
-        collection = MongoDB.get_collection(Collections.MODELS)
+        collection = MongoDB.get_collection(Collections.MODELS, CATALOG_READ_PREFERENCE)
         
         if collection is None:
             return jsonify({'models': _get_mock_model_metrics()})
@@ -120,10 +201,11 @@ def get_models():
 
 
 @recommendation_bp.route('/models/compare', methods=['GET'])
+@cached_response(ttl=60)
 def compare_models():
     """Compare metrics across all models."""
     try:
-        collection = MongoDB.get_collection(Collections.MODELS)
+        collection = MongoDB.get_collection(Collections.MODELS, CATALOG_READ_PREFERENCE)
         
         if collection is None:
             return jsonify({'comparison': {'metrics': ['rmse', 'mae', 'precision@10', 'recall@10'], 'models': _get_mock_model_metrics()}})
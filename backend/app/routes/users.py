@@ -2,37 +2,64 @@
 API routes for user management.
 """
 from flask import Blueprint, request, jsonify
+from pymongo import ReadPreference
+from pymongo.errors import OperationFailure
 from app.database.connection import MongoDB, Collections
+from app.database.cache import (
+    RedisCache, user_profile_key, user_history_key, user_rating_key, invalidate_user
+)
 from datetime import datetime
 from typing import Dict, List
 
 
 users_bp = Blueprint('users', __name__)
 
+# Caps on client-supplied sizes
+MAX_PAGE_SIZE = 100
+MAX_WATCH_BATCH = 100
+
+# Redis TTLs for the per-user reads (writes invalidate them right away)
+USER_PROFILE_CACHE_TTL = 300
+USER_HISTORY_CACHE_TTL = 60
+
 
 @users_bp.route('/users', methods=['GET'])
 def get_users():
-    """Get list of users with pagination."""
+    """
+    Get list of users ordered by userId.
+    
+    Query params:
+        after: userId from a previous response's nextCursor (seeks instead
+               of skipping; preferred over page)
+        page: Page number (default 1, deprecated in favour of after)
+        limit: Items per page (default 20)
+    """
     try:
-        page = int(request.args.get('page', 1))
-        limit = min(int(request.args.get('limit', 20)), 100)
+        page = max(1, request.args.get('page', 1, type=int))
+        limit = min(request.args.get('limit', 20, type=int) or 20, MAX_PAGE_SIZE)
+        after = request.args.get('after', type=int)
         
         collection = MongoDB.get_collection(Collections.USERS)
         
         if collection is None:
             return jsonify(_get_mock_users())
         
-        skip = (page - 1) * limit
-        cursor = collection.find().skip(skip).limit(limit)
+        # Seek past the cursor on the userId index, or skip for page numbers
+        if after is not None:
+            cursor = collection.find({'userId': {'$gt': after}})
+        else:
+            cursor = collection.find().skip((page - 1) * limit)
+        cursor = cursor.sort('userId', 1).limit(limit).batch_size(limit)
         
         users = [_serialize_user(doc) for doc in cursor]
-        total = collection.count_documents({})
+        total = collection.estimated_document_count()
         
         return jsonify({
             'users': users,
             'page': page,
             'limit': limit,
-            'total': total
+            'total': total,
+            'nextCursor': users[-1]['userId'] if len(users) == limit else None
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -50,12 +77,20 @@ def get_user(user_id: int):
                 return jsonify(mock)
             return jsonify({'error': 'User not found'}), 404
         
+        cache_key = user_profile_key(user_id)
+        cached = RedisCache.get_json(cache_key)
+        if cached is not None:
+            return jsonify(cached)
+        
         user = collection.find_one({'userId': user_id})
         
         if user is None:
             return jsonify({'error': 'User not found'}), 404
         
-        return jsonify(_serialize_user(user))
+        serialized = _serialize_user(user)
+        if _reads_primary(collection):
+            RedisCache.set_json(cache_key, serialized, USER_PROFILE_CACHE_TTL)
+        return jsonify(serialized)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -64,30 +99,39 @@ def get_user(user_id: int):
 def get_user_history(user_id: int):
     """Get user's rating history."""
     try:
-        limit = min(int(request.args.get('limit', 50)), 100)
+        limit = min(request.args.get('limit', 50, type=int) or 50, MAX_PAGE_SIZE)
         
         ratings_col = MongoDB.get_collection(Collections.RATINGS)
-        movies_col = MongoDB.get_collection(Collections.MOVIES)
         
         if ratings_col is None:
             return jsonify(_get_mock_user_history(user_id, limit))
         
-        # Get user's ratings
-        cursor = ratings_col.find({'userId': user_id}).sort('timestamp', -1).limit(limit)
+        cache_key = user_history_key(user_id)
+        cached = RedisCache.hget_json(cache_key, str(limit))
+        if cached is not None:
+            return jsonify(cached)
+        
+        # Page the user's ratings first, then join just that page to movies
+        # in the same round trip
+        cursor = ratings_col.aggregate([
+            {'$match': {'userId': user_id}},
+            {'$sort': {'timestamp': -1}},
+            {'$limit': limit},
+            *_movie_lookup_stages()
+        ], batchSize=limit)
         
         history = []
         for rating in cursor:
-            movie_info = {'movieId': rating['movieId'], 'title': f"Movie {rating['movieId']}"}
-            
-            if movies_col is not None:
-                movie = movies_col.find_one({'movieId': rating['movieId']})
-                if movie:
-                    movie_info = {
-                        'movieId': movie['movieId'],
-                        'title': movie.get('title', ''),
-                        'genres': movie.get('genres', []),
-                        'avgRating': float(movie.get('avgRating', 0))
-                    }
+            movie = rating.get('movie')
+            if movie:
+                movie_info = {
+                    'movieId': rating['movieId'],
+                    'title': movie.get('title', ''),
+                    'genres': movie.get('genres', []),
+                    'avgRating': float(movie.get('avgRating', 0))
+                }
+            else:
+                movie_info = {'movieId': rating['movieId'], 'title': f"Movie {rating['movieId']}"}
             
             history.append({
                 **movie_info,
@@ -95,7 +139,10 @@ def get_user_history(user_id: int):
                 'timestamp': rating.get('timestamp', datetime.utcnow()).isoformat()
             })
         
-        return jsonify({'userId': user_id, 'history': history})
+        result = {'userId': user_id, 'history': history}
+        if _reads_primary(ratings_col):
+            RedisCache.hset_json(cache_key, str(limit), result, USER_HISTORY_CACHE_TTL)
+        return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -104,28 +151,31 @@ def get_user_history(user_id: int):
 def get_watch_history(user_id: int):
     """Get user's watch history (movies they've watched)."""
     try:
-        limit = min(int(request.args.get('limit', 50)), 100)
+        limit = min(request.args.get('limit', 50, type=int) or 50, MAX_PAGE_SIZE)
         
         watch_col = MongoDB.get_collection(Collections.WATCH_HISTORY)
-        movies_col = MongoDB.get_collection(Collections.MOVIES)
         
         if watch_col is None:
             return jsonify({'userId': user_id, 'watchHistory': []})
         
-        cursor = watch_col.find({'userId': user_id}).sort('watchedAt', -1).limit(limit)
+        cursor = watch_col.aggregate([
+            {'$match': {'userId': user_id}},
+            {'$sort': {'watchedAt': -1}},
+            {'$limit': limit},
+            *_movie_lookup_stages()
+        ], batchSize=limit)
         
         watch_history = []
         for item in cursor:
             movie_info = {'movieId': item['movieId']}
             
-            if movies_col is not None:
-                movie = movies_col.find_one({'movieId': item['movieId']})
-                if movie:
-                    movie_info.update({
-                        'title': movie.get('title', ''),
-                        'genres': movie.get('genres', []),
-                        'avgRating': float(movie.get('avgRating', 0))
-                    })
+            movie = item.get('movie')
+            if movie:
+                movie_info.update({
+                    'title': movie.get('title', ''),
+                    'genres': movie.get('genres', []),
+                    'avgRating': float(movie.get('avgRating', 0))
+                })
             
             watch_history.append({
                 **movie_info,
@@ -157,21 +207,9 @@ def add_watch_history(user_id: int):
                 'movieId': movie_id
             })
         
-        # Add to watch history
-        watch_doc = {
-            'userId': user_id,
-            'movieId': movie_id,
-            'watchedAt': datetime.utcnow()
-        }
-        watch_col.insert_one(watch_doc)
+        _record_watches(watch_col, users_col, user_id, [movie_id])
         
-        # Update user's watched movies list
-        if users_col is not None:
-            users_col.update_one(
-                {'userId': user_id},
-                {'$addToSet': {'watchedMovies': movie_id}},
-                upsert=True
-            )
+        invalidate_user(user_id)
         
         return jsonify({
             'message': 'Watch history recorded',
@@ -182,6 +220,45 @@ def add_watch_history(user_id: int):
         return jsonify({'error': str(e)}), 500
 
 
+@users_bp.route('/users/<int:user_id>/watch/batch', methods=['POST'])
+def add_watch_history_batch(user_id: int):
+    """Record several watched movies for a user in one request."""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        movie_ids = data.get('movieIds')
+        
+        if not movie_ids or not isinstance(movie_ids, list):
+            return jsonify({'error': 'movieIds must be a non-empty list'}), 400
+        if not all(isinstance(movie_id, int) for movie_id in movie_ids):
+            return jsonify({'error': 'movieIds must be integers'}), 400
+        if len(movie_ids) > MAX_WATCH_BATCH:
+            return jsonify({'error': f'At most {MAX_WATCH_BATCH} movieIds per batch'}), 400
+        
+        watch_col = MongoDB.get_collection(Collections.WATCH_HISTORY)
+        users_col = MongoDB.get_collection(Collections.USERS)
+        
+        if watch_col is None:
+            return jsonify({
+                'message': 'Watch history recorded (mock)',
+                'userId': user_id,
+                'movieIds': movie_ids
+            })
+        
+        _record_watches(watch_col, users_col, user_id, movie_ids)
+        
+        invalidate_user(user_id)
+        
+        return jsonify({
+            'message': 'Watch history recorded',
+            'userId': user_id,
+            'movieIds': movie_ids
+        }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @users_bp.route('/ratings', methods=['POST'])
 def add_rating():
     """Add a new rating."""
@@ -238,6 +315,8 @@ def add_rating():
         if movies_col is not None:
             _update_movie_rating_stats(ratings_col, movies_col, movie_id)
         
+        invalidate_user(user_id, movie_id)
+        
         return jsonify({
             'message': 'Rating added successfully',
             'userId': user_id,
@@ -257,17 +336,25 @@ def get_rating(user_id: int, movie_id: int):
         if collection is None:
             return jsonify({'userId': user_id, 'movieId': movie_id, 'rating': None})
         
+        cache_key = user_rating_key(user_id, movie_id)
+        cached = RedisCache.get_json(cache_key)
+        if cached is not None:
+            return jsonify(cached)
+        
         rating = collection.find_one({'userId': user_id, 'movieId': movie_id})
         
         if rating is None:
-            return jsonify({'userId': user_id, 'movieId': movie_id, 'rating': None})
-        
-        return jsonify({
-            'userId': user_id,
-            'movieId': movie_id,
-            'rating': float(rating['rating']),
-            'timestamp': rating.get('timestamp', datetime.utcnow()).isoformat()
-        })
+            result = {'userId': user_id, 'movieId': movie_id, 'rating': None}
+        else:
+            result = {
+                'userId': user_id,
+                'movieId': movie_id,
+                'rating': float(rating['rating']),
+                'timestamp': rating.get('timestamp', datetime.utcnow()).isoformat()
+            }
+        if _reads_primary(collection):
+            RedisCache.set_json(cache_key, result, USER_PROFILE_CACHE_TTL)
+        return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -299,34 +386,113 @@ def delete_rating(user_id: int, movie_id: int):
         if movies_col is not None:
             _update_movie_rating_stats(ratings_col, movies_col, movie_id)
         
+        invalidate_user(user_id, movie_id)
+        
         return jsonify({'message': 'Rating deleted successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _reads_primary(collection) -> bool:
+    """
+    Whether reads through collection go to the primary.
+    
+    Only those results are cached: a lagging secondary read right after an
+    invalidation would otherwise put stale data back for the whole TTL.
+    """
+    return collection.read_preference == ReadPreference.PRIMARY
+
+
+def _record_watches(watch_col, users_col, user_id: int, movie_ids: List[int]):
+    """
+    Write watch events and add the movies to the user's watched list.
+    
+    However many movies are recorded, this is one insert into watch_history
+    and one $addToSet/$each update of the user.
+    
+    Args:
+        watch_col: Watch history collection
+        users_col: Users collection (may be None)
+        user_id: User ID
+        movie_ids: Watched movie IDs, in viewing order
+    """
+    now = datetime.utcnow()
+    watch_col.insert_many(
+        [{'userId': user_id, 'movieId': movie_id, 'watchedAt': now} for movie_id in movie_ids],
+        ordered=False
+    )
+    
+    if users_col is not None:
+        users_col.update_one(
+            {'userId': user_id},
+            {'$addToSet': {'watchedMovies': {'$each': movie_ids}}},
+            upsert=True
+        )
+
+
+def _movie_lookup_stages() -> List[Dict]:
+    """
+    Pipeline stages joining each document to its movie.
+    
+    The movie is attached as a 'movie' sub-document holding only the fields
+    the history views show, and documents whose movie is missing are kept.
+    
+    Returns:
+        Aggregation stages to append after $match/$sort/$limit
+    """
+    return [
+        {'$lookup': {
+            'from': Collections.MOVIES,
+            'localField': 'movieId',
+            'foreignField': 'movieId',
+            'as': 'movie'
+        }},
+        {'$unwind': {'path': '$movie', 'preserveNullAndEmptyArrays': True}},
+        {'$project': {
+            'movieId': 1,
+            'rating': 1,
+            'timestamp': 1,
+            'watchedAt': 1,
+            'movie.title': 1,
+            'movie.genres': 1,
+            'movie.avgRating': 1
+        }}
+    ]
+
+
 def _update_movie_rating_stats(ratings_col, movies_col, movie_id: int):
-    """Update movie's average rating and count."""
+    """
+    Update movie's average rating and count.
+    
+    The stats are computed from the (movieId, rating) index alone and
+    written back with $merge, so the refresh is a single round trip.
+    """
     pipeline = [
         {'$match': {'movieId': movie_id}},
         {'$group': {
             '_id': '$movieId',
             'avgRating': {'$avg': '$rating'},
             'ratingCount': {'$sum': 1}
+        }},
+        {'$project': {
+            '_id': 0,
+            'movieId': '$_id',
+            'avgRating': {'$round': ['$avgRating', 2]},
+            'ratingCount': 1,
+            'updatedAt': '$$NOW'
+        }},
+        {'$merge': {
+            'into': movies_col.name,
+            'on': 'movieId',
+            'whenMatched': 'merge',
+            'whenNotMatched': 'discard'
         }}
     ]
     
-    result = list(ratings_col.aggregate(pipeline))
-    
-    if result:
-        stats = result[0]
-        movies_col.update_one(
-            {'movieId': movie_id},
-            {'$set': {
-                'avgRating': round(stats['avgRating'], 2),
-                'ratingCount': stats['ratingCount'],
-                'updatedAt': datetime.utcnow()
-            }}
-        )
+    try:
+        ratings_col.aggregate(pipeline, hint=[('movieId', 1), ('rating', 1)])
+    except OperationFailure:
+        ratings_col.aggregate(pipeline)
 
 
 def _serialize_user(doc: Dict) -> Dict:
@@ -349,7 +515,7 @@ def _get_mock_users() -> Dict:
         {'userId': 4, 'username': 'Phạm Thị D', 'ratedMovies': [1, 2, 3, 4], 'watchedMovies': [1, 2, 3, 4, 5], 'preferences': {'favoriteGenres': ['Drama']}},
         {'userId': 5, 'username': 'Hoàng Văn E', 'ratedMovies': [6, 7, 9], 'watchedMovies': [6, 7, 9, 3], 'preferences': {'favoriteGenres': ['Sci-Fi', 'Action']}},
     ]
-    return {'users': users, 'page': 1, 'limit': 20, 'total': len(users)}
+    return {'users': users, 'page': 1, 'limit': 20, 'total': len(users), 'nextCursor': None}
 
 
 def _get_mock_user(user_id: int) -> Dict:
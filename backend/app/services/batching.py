@@ -0,0 +1,96 @@
+"""
+Request coalescing for batched model inference.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Set
+
+
+class RecommendationBatcher:
+    """
+    Coalesce concurrent recommendation requests into recommend_batch calls.
+    
+    Requests are queued and a background thread scores them with one
+    model.recommend_batch() call per group. A request that finds the queue
+    otherwise empty is scored right away; when others are already waiting,
+    the thread keeps collecting (up to max_batch, at most max_wait seconds
+    after the first) so bursts share a call. Each caller gets its own list
+    back through a Future.
+    """
+    
+    def __init__(self, model, max_batch: int = 64, max_wait: float = 0.005):
+        """
+        Initialize the batcher and start its worker thread.
+        
+        Args:
+            model: Fitted model exposing recommend_batch()
+            max_batch: Maximum requests scored together
+            max_wait: Seconds to keep collecting after the first request
+        """
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: queue.Queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+    
+    def submit(self, user_id: int, n: int, exclude: Set[int]) -> Future:
+        """
+        Queue one recommendation request.
+        
+        Args:
+            user_id: User ID
+            n: Number of recommendations
+            exclude: Movie IDs to exclude
+            
+        Returns:
+            Future resolving to the recommendation list
+        """
+        future: Future = Future()
+        self._queue.put((user_id, n, exclude, future))
+        return future
+    
+    def _run(self) -> None:
+        while True:
+            pending = [self._queue.get()]
+            # A lone request is not held back waiting for company
+            deadline = time.monotonic() + self.max_wait if not self._queue.empty() else 0
+            while len(pending) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            # Each group shares n (recommend_batch takes one) and has
+            # distinct users (excludes are keyed by user); the rest wait
+            # for a later group of the same drain
+            while pending:
+                n = pending[0][1]
+                group, seen, rest = [], set(), []
+                for request in pending:
+                    if request[1] != n or request[0] in seen:
+                        rest.append(request)
+                    else:
+                        seen.add(request[0])
+                        group.append(request)
+                self._score(group, n)
+                pending = rest
+    
+    def _score(self, group: List[tuple], n: int) -> None:
+        user_ids = [user_id for user_id, *_ in group]
+        exclude_per_user = {user_id: exclude for user_id, _, exclude, _ in group}
+        
+        try:
+            results = self.model.recommend_batch(user_ids, n=n, exclude_per_user=exclude_per_user)
+        except Exception as e:
+            for *_, future in group:
+                future.set_exception(e)
+            return
+        
+        for (*_, future), recommendations in zip(group, results):
+            future.set_result(recommendations)
@@ -7,6 +7,10 @@ import re
 from typing import Tuple, Optional
 from datetime import datetime
 
+# Trailing "(1995)" year in MovieLens titles
+_YEAR_RE = re.compile(r'\((\d{4})\)\s*$')
+_YEAR_SUFFIX_RE = re.compile(r'\s*\(\d{4}\)\s*$')
+
 
 class DataProcessor:
     """Service for processing and cleaning movie data."""
@@ -132,10 +136,10 @@ class DataProcessor:
         Returns:
             Tuple of (clean_title, year)
         """
-        match = re.search(r'\((\d{4})\)\s*$', title)
+        match = _YEAR_RE.search(title)
         if match:
             year = int(match.group(1))
-            clean_title = re.sub(r'\s*\(\d{4}\)\s*$', '', title)
+            clean_title = _YEAR_SUFFIX_RE.sub('', title)
             return clean_title.strip(), year
         return title.strip(), None
     
@@ -156,13 +160,18 @@ class DataProcessor:
         # Remove duplicates
         movies_df = cls.remove_duplicates(movies_df, subset=['movieId'])
         
-        # Parse genres
-        movies_df['genres'] = movies_df['genres'].apply(cls.parse_genres)
+        # Parse genres: a catalog has few distinct genre strings, so parse
+        # each one once and give every row its own copy of the list
+        codes, uniques = pd.factorize(movies_df['genres'])
+        parsed = [cls.parse_genres(genres_str) for genres_str in uniques]
+        movies_df['genres'] = [list(parsed[code]) if code >= 0 else [] for code in codes]
         
-        # Extract year from title
-        title_year = movies_df['title'].apply(cls.extract_year_from_title)
-        movies_df['cleanTitle'] = title_year.apply(lambda x: x[0])
-        movies_df['year'] = title_year.apply(lambda x: x[1])
+        # Extract year from title (vectorized; same patterns as
+        # extract_year_from_title)
+        titles = movies_df['title'].astype(str)
+        years = titles.str.extract(_YEAR_RE, expand=False)
+        movies_df['year'] = pd.to_numeric(years, errors='coerce').astype('Int64')
+        movies_df['cleanTitle'] = titles.str.replace(_YEAR_SUFFIX_RE, '', regex=True).str.strip()
         
         # Add timestamps
         now = datetime.utcnow()
@@ -222,15 +222,28 @@ class ModelEvaluator:
             # Get items to exclude (already seen in training)
             exclude = set(user_train['movieId'])
             
-            # Get predictions for test items
-            for _, row in user_test.iterrows():
+            # Get predictions for test items, in one pass when the model
+            # supports batched prediction; if that fails, predict item by
+            # item so only the failing items are dropped
+            test_movies = user_test['movieId'].tolist()
+            preds = None
+            if hasattr(model, 'predict_ratings'):
                 try:
-                    pred = model.predict_rating(user_id, row['movieId'])
-                    if pred is not None:
-                        y_true.append(row['rating'])
-                        y_pred.append(pred)
+                    preds = model.predict_ratings(user_id, test_movies)
                 except Exception:
                     pass
+            if preds is None:
+                preds = []
+                for movie_id in test_movies:
+                    try:
+                        preds.append(model.predict_rating(user_id, movie_id))
+                    except Exception:
+                        preds.append(None)
+            
+            for actual, pred in zip(user_test['rating'].tolist(), preds):
+                if pred is not None:
+                    y_true.append(actual)
+                    y_pred.append(pred)
             
             # Get recommendations
             try:
@@ -12,11 +12,18 @@ from sklearn.preprocessing import normalize
 class Vectorizer:
     """Service for vectorizing movie data."""
     
-    def __init__(self):
-        """Initialize vectorizer."""
+    def __init__(self, load_sentence_model: bool = True):
+        """
+        Initialize vectorizer.
+        
+        Args:
+            load_sentence_model: Whether to load the sentence transformer
+                (skip it when only TF-IDF is needed)
+        """
         self.tfidf_vectorizer: Optional[TfidfVectorizer] = None
         self.sentence_model = None
-        self._load_sentence_model()
+        if load_sentence_model:
+            self._load_sentence_model()
     
     def _load_sentence_model(self):
         """Lazily load sentence transformer model."""
@@ -58,6 +65,22 @@ class Vectorizer:
         
         return tfidf_matrix, feature_names
     
+    def tfidf_transform(self, genres_list: List[List[str]]) -> sparse.csr_matrix:
+        """
+        Transform genre lists with the already fitted TF-IDF vectorizer.
+        
+        Args:
+            genres_list: List of genre lists for each movie
+            
+        Returns:
+            TF-IDF matrix using the fitted vocabulary
+        """
+        if self.tfidf_vectorizer is None:
+            raise RuntimeError("TF-IDF vectorizer not fitted. Call tfidf_vectorize() first.")
+        
+        genres_text = [' '.join(genres) for genres in genres_list]
+        return self.tfidf_vectorizer.transform(genres_text)
+    
     def create_embeddings(self, texts: List[str], 
                           batch_size: int = 32) -> Optional[np.ndarray]:
         """
@@ -93,18 +116,21 @@ class Vectorizer:
         Returns:
             Numpy array of movie embeddings
         """
-        # Combine title and genres for richer representation
-        texts = []
-        for _, row in movies_df.iterrows():
-            title = row.get('cleanTitle', row.get('title', ''))
-            genres = row.get('genres', [])
-            if isinstance(genres, list):
-                genres_str = ', '.join(genres)
-            else:
-                genres_str = str(genres)
-            
-            text = f"{title}. Genres: {genres_str}"
-            texts.append(text)
+        # Combine title and genres for richer representation, reading the
+        # columns once instead of building a Series per row
+        if 'cleanTitle' in movies_df.columns:
+            titles = movies_df['cleanTitle'].tolist()
+        elif 'title' in movies_df.columns:
+            titles = movies_df['title'].tolist()
+        else:
+            titles = [''] * len(movies_df)
+        genres_col = (movies_df['genres'].tolist() if 'genres' in movies_df.columns
+                      else [[]] * len(movies_df))
+        
+        texts = [
+            f"{title}. Genres: {', '.join(genres) if isinstance(genres, list) else genres}"
+            for title, genres in zip(titles, genres_col)
+        ]
         
         return self.create_embeddings(texts)
     
@@ -121,20 +147,16 @@ class Vectorizer:
         Returns:
             Tuple of (sparse matrix, user_ids, movie_ids)
         """
-        # Get unique users and movies
-        user_ids = sorted(ratings_df['userId'].unique())
-        movie_ids = sorted(ratings_df['movieId'].unique())
-        
-        # Create mappings
-        user_to_idx = {uid: idx for idx, uid in enumerate(user_ids)}
-        movie_to_idx = {mid: idx for idx, mid in enumerate(movie_ids)}
+        # Encode users and movies as sorted integer codes in one C pass
+        rows, user_uniques = pd.factorize(ratings_df['userId'], sort=True)
+        cols, movie_uniques = pd.factorize(ratings_df['movieId'], sort=True)
+        user_ids = user_uniques.tolist()
+        movie_ids = movie_uniques.tolist()
         
         # Create sparse matrix
         n_users = len(user_ids)
         n_movies = len(movie_ids)
         
-        rows = ratings_df['userId'].map(user_to_idx).values
-        cols = ratings_df['movieId'].map(movie_to_idx).values
         data = ratings_df['rating'].values
         
         matrix = sparse.csr_matrix(
@@ -145,12 +167,14 @@ class Vectorizer:
         return matrix, user_ids, movie_ids
     
     @staticmethod
-    def compute_cosine_similarity(matrix: np.ndarray) -> np.ndarray:
+    def compute_cosine_similarity(matrix: np.ndarray, dense_output: bool = True):
         """
         Compute cosine similarity matrix.
         
         Args:
             matrix: Feature matrix (n_samples x n_features)
+            dense_output: Densify the result; pass False to keep a sparse
+                          input's similarity matrix in CSR form
             
         Returns:
             Similarity matrix (n_samples x n_samples)
@@ -159,11 +183,9 @@ class Vectorizer:
         normalized = normalize(matrix, axis=1, norm='l2')
         
         # Compute similarity
-        if sparse.issparse(normalized):
-            similarity = normalized @ normalized.T
+        similarity = normalized @ normalized.T
+        if dense_output and sparse.issparse(similarity):
             similarity = similarity.toarray()
-        else:
-            similarity = normalized @ normalized.T
         
         return similarity
     
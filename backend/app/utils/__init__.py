@@ -9,7 +9,10 @@ from app.utils.helpers import (
     safe_float,
     safe_int,
     paginate_list,
-    clip_rating
+    clip_rating,
+    TTLCache,
+    ttl_cache,
+    cached_response
 )
 
 __all__ = [
@@ -20,5 +23,8 @@ __all__ = [
     'safe_float',
     'safe_int',
     'paginate_list',
-    'clip_rating'
+    'clip_rating',
+    'TTLCache',
+    'ttl_cache',
+    'cached_response'
 ]
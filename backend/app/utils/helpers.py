@@ -2,7 +2,11 @@
 Utility helper functions.
 """
 import re
-from typing import List, Dict, Any, Optional
+import time
+import threading
+import functools
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
 import hashlib
 
@@ -123,3 +127,133 @@ def denormalize_rating(normalized: float, min_val: float = 0.5, max_val: float =
 def clip_rating(rating: float, min_val: float = 0.5, max_val: float = 5.0) -> float:
     """Clip rating to valid range."""
     return max(min_val, min(max_val, rating))
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire ttl seconds after insertion."""
+    
+    def __init__(self, maxsize: int = 128, ttl: float = 60.0):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries kept
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the live value for key, or default when missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: Any, value: Any) -> None:
+        """Store value under key, evicting the least recently used beyond maxsize."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+
+_MISSING = object()
+
+
+def ttl_cache(ttl: float = 60.0, maxsize: int = 32) -> Callable:
+    """
+    Memoize a function's results for a limited time.
+    
+    Entries are keyed on the call arguments, expire ttl seconds after they
+    were computed and are evicted least-recently-used beyond maxsize.
+    Exceptions are not cached. The wrapped function gains cache_clear(),
+    cache_peek(*args) (the live cached value or None, without calling
+    the function) and cache_put(value, *args) (store a value computed
+    elsewhere).
+    
+    Args:
+        ttl: Seconds a cached result stays valid
+        maxsize: Maximum number of cached argument combinations
+        
+    Returns:
+        Decorator applying the cache
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        
+        def make_key(args, kwargs):
+            return (args, tuple(sorted(kwargs.items())))
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.put(key, value)
+            return value
+        
+        wrapper.cache_peek = lambda *args, **kwargs: cache.get(make_key(args, kwargs))
+        wrapper.cache_put = lambda value, *args, **kwargs: cache.put(make_key(args, kwargs), value)
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+def cached_response(ttl: float = 60.0, maxsize: int = 2048) -> Callable:
+    """
+    Cache a Flask view's successful responses by path and query string.
+    
+    The serialized body is stored, so repeat requests within ttl skip both
+    the database work and JSON encoding. Only buffered 200 responses are
+    cached; streamed ones pass through untouched.
+    Responses carry an ETag of the body, and a request whose If-None-Match
+    matches gets an empty 304 instead. The wrapped view gains cache_clear().
+    
+    Args:
+        ttl: Seconds a cached response stays valid
+        maxsize: Maximum number of distinct requests cached
+        
+    Returns:
+        Decorator applying the cache
+    """
+    from flask import current_app, make_response, request
+    
+    def decorator(view: Callable) -> Callable:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            cached = cache.get(key)
+            if cached is not None:
+                body, mimetype, etag = cached
+                response = current_app.response_class(body, mimetype=mimetype)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                etag = hashlib.md5(body).hexdigest()
+                cache.put(key, (body, response.mimetype, etag))
+            
+            response.set_etag(etag)
+            return response.make_conditional(request)
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
@@ -0,0 +1,39 @@
+"""
+Fast JSON encoding for Flask responses.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes with orjson.
+    
+    Keys are sorted like Flask's default provider so response bodies (and
+    their ETags) stay stable, NumPy scalars and arrays from the models are
+    serialized directly, and anything else orjson does not know falls back
+    to Flask's default conversions. Decoding is left to the default provider.
+    """
+    
+    def _options(self) -> int:
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            options |= orjson.OPT_INDENT_2
+        return options
+    
+    def dumps(self, obj, **kwargs) -> str:
+        """Serialize obj to a JSON string."""
+        return self._dump_bytes(obj).decode()
+    
+    def response(self, *args, **kwargs):
+        """Build a JSON response without an intermediate str."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dump_bytes(obj), mimetype=self.mimetype)
+    
+    def _dump_bytes(self, obj) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options())
@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration.
+Run: gunicorn -c gunicorn.conf.py run:app
+"""
+import gc
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+
+# Import the app (and load the models, see WARMUP_MODELS) once in the
+# master; forked workers then share the model pages copy-on-write.
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Keep the collector from touching (and so copying) preloaded objects
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app.database.connection import MongoDB
+    MongoDB.reconnect()
@@ -77,6 +77,14 @@ def import_movies(db, movies_df):
         batch = records[i:i + batch_size]
         db.movies.insert_many(batch)
     
+    # Genre list for /api/genres, so the API never scans movies for it
+    genres = sorted({g for genres in movies_df['genres'] for g in genres if isinstance(g, str)})
+    db.meta.update_one(
+        {'_id': 'genres'},
+        {'$set': {'list': genres, 'updatedAt': datetime.utcnow()}},
+        upsert=True
+    )
+    
     print(f"✓ Imported {len(records)} movies")
 
 
@@ -208,21 +216,11 @@ def create_users(db, ratings_df, movies_df):
 
 
 def create_indices(db):
-    """Create database indices."""
-    print("\nCreating indices...")
-    
-    db.movies.create_index("movieId", unique=True)
-    db.movies.create_index("genres")
-    db.movies.create_index([("avgRating", -1)])
-    db.movies.create_index([("title", "text")])
+    """Create database indices (the app does not build them at startup)."""
+    from app.database.schemas import create_indices as create_schema_indices
     
-    db.users.create_index("userId", unique=True)
-    
-    db.ratings.create_index([("userId", 1), ("movieId", 1)], unique=True)
-    db.ratings.create_index("movieId")
-    db.ratings.create_index([("timestamp", -1)])
-    
-    print("✓ Indices created")
+    print("\nCreating indices...")
+    create_schema_indices(db)
 
 
 def main():
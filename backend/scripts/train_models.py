@@ -30,7 +30,7 @@ def load_data_from_mongodb(db):
     print("\nLoading data from MongoDB...")
     
     # Load movies
-    movies_cursor = db.movies.find({})
+    movies_cursor = db.movies.find({}, {'tfidfVector': 0, 'embedding': 0})
     movies_df = pd.DataFrame(list(movies_cursor))
     print(f"  Movies: {len(movies_df):,}")
     
@@ -67,13 +67,18 @@ def train_content_based(movies_df, ratings_df, save_path):
     model = ContentBasedModel()
     model.fit(movies_df, tfidf_matrix=tfidf_matrix)
     
-    print(f"  Similarity matrix shape: {model.similarity_matrix.shape}")
+    print(f"  Feature matrix shape: {model._X_norm.shape}")
     
     # Save model
     with open(save_path, 'wb') as f:
         pickle.dump(model, f)
     print(f"✓ Model saved to: {save_path}")
     
+    # Memory-mappable copy for the API workers
+    array_dir = os.path.splitext(save_path)[0]
+    model.save(array_dir)
+    print(f"✓ Model arrays saved to: {array_dir}")
+    
     return model
 
 
@@ -97,6 +102,11 @@ def train_item_based(movies_df, ratings_df, save_path):
         pickle.dump(model, f)
     print(f"✓ Model saved to: {save_path}")
     
+    # Memory-mappable copy for the API workers
+    array_dir = os.path.splitext(save_path)[0]
+    model.save(array_dir)
+    print(f"✓ Model arrays saved to: {array_dir}")
+    
     return model
 
 
@@ -120,6 +130,11 @@ def train_user_based(movies_df, ratings_df, save_path):
         pickle.dump(model, f)
     print(f"✓ Model saved to: {save_path}")
     
+    # Memory-mappable copy for the API workers
+    array_dir = os.path.splitext(save_path)[0]
+    model.save(array_dir)
+    print(f"✓ Model arrays saved to: {array_dir}")
+    
     return model
 
 
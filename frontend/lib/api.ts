@@ -114,14 +114,16 @@ async function fetchApi<T>(endpoint: string, options?: RequestInit): Promise<T>
 // ============= Movies API =============
 
 export async function getMovies(params?: {
+    after?: string;
     page?: number;
     limit?: number;
     genre?: string;
     sort?: string;
     order?: 'asc' | 'desc';
     search?: string;
-}): Promise<{ movies: Movie[]; page: number; limit: number; total: number; pages: number }> {
+}): Promise<{ movies: Movie[]; page: number; limit: number; total: number; pages: number; nextCursor: string | null }> {
     const searchParams = new URLSearchParams();
+    if (params?.after) searchParams.set('after', params.after);
     if (params?.page) searchParams.set('page', String(params.page));
     if (params?.limit) searchParams.set('limit', String(params.limit));
     if (params?.genre) searchParams.set('genre', params.genre);
@@ -132,15 +134,53 @@ export async function getMovies(params?: {
     return fetchApi(`/movies?${searchParams.toString()}`);
 }
 
+// Streams a movie page as NDJSON, calling onMovie as each movie arrives;
+// resolves with the listing metadata sent on the final line.
+export async function streamMovies(
+    params: Parameters<typeof getMovies>[0],
+    onMovie: (movie: Movie) => void
+): Promise<{ page: number; limit: number; total: number; pages: number; nextCursor: string | null }> {
+    const searchParams = new URLSearchParams({ format: 'ndjson' });
+    for (const [key, value] of Object.entries(params ?? {})) {
+        if (value) searchParams.set(key, String(value));
+    }
+
+    const response = await fetch(`${API_BASE_URL}/movies?${searchParams.toString()}`);
+    if (!response.ok || !response.body) {
+        const errorData = await response.json().catch(() => ({ error: 'Unknown error' }));
+        throw new ApiError(response.status, errorData.error || 'Request failed');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let meta = null;
+    for (;;) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value, { stream: !done });
+        const lines = buffer.split('\n');
+        buffer = lines.pop() ?? '';
+        for (const line of lines) {
+            if (!line) continue;
+            const item = JSON.parse(line);
+            if (item._meta) meta = item._meta;
+            else onMovie(item as Movie);
+        }
+        if (done) break;
+    }
+    return meta;
+}
+
 export async function getMovie(movieId: number): Promise<Movie> {
     return fetchApi(`/movies/${movieId}`);
 }
 
 export async function getMoviesByGenre(
     genre: string,
-    params?: { page?: number; limit?: number }
-): Promise<{ movies: Movie[]; genre: string; page: number; limit: number; total: number }> {
+    params?: { after?: string; page?: number; limit?: number }
+): Promise<{ movies: Movie[]; genre: string; page: number; limit: number; total: number; nextCursor: string | null }> {
     const searchParams = new URLSearchParams();
+    if (params?.after) searchParams.set('after', params.after);
     if (params?.page) searchParams.set('page', String(params.page));
     if (params?.limit) searchParams.set('limit', String(params.limit));
 
@@ -190,6 +230,13 @@ export async function recordWatch(userId: number, movieId: number): Promise<{ me
     });
 }
 
+export async function recordWatchBatch(userId: number, movieIds: number[]): Promise<{ message: string }> {
+    return fetchApi(`/users/${userId}/watch/batch`, {
+        method: 'POST',
+        body: JSON.stringify({ movieIds }),
+    });
+}
+
 // ============= Recommendations API =============
 
 export async function getRecommendations(
@@ -248,7 +295,7 @@ export async function getGenreFrequency(): Promise<{ genres: GenreFrequency[] }>
 export async function getHeatmapData(
     nUsers: number = 20,
     nMovies: number = 20
-): Promise<{ userIds: number[]; movieIds: number[]; matrix: Record<number, Record<number, number>> }> {
+): Promise<{ userIds: number[]; movieIds: number[]; matrix: (number | null)[][] }> {
     return fetchApi(`/analytics/heatmap?n_users=${nUsers}&n_movies=${nMovies}`);
 }
 